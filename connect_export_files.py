@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Export File Helpers for Amazon Connect migration scripts
+Shared by the scripts that read user export files, so compressed formats are handled in one place.
+"""
+
+import gzip
+
+try:
+    import zstandard as zstd
+except ImportError:  # Optional - only needed for .zst compressed exports
+    zstd = None
+
+def open_export_file(export_file: str):
+    """
+    Open an export file for binary reading, decompressing .gz and .zst files transparently
+    
+    Args:
+        export_file: Path to the export file
+        
+    Returns:
+        Binary file object
+    """
+    if export_file.endswith('.gz'):
+        return gzip.open(export_file, 'rb')
+    if export_file.endswith('.zst'):
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read .zst exports (pip install zstandard)")
+        return zstd.ZstdDecompressor().stream_reader(open(export_file, 'rb'), closefd=True)
+    return open(export_file, 'rb')
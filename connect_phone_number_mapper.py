@@ -9,6 +9,7 @@ import json
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Configure logging
@@ -23,19 +24,23 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class ConnectPhoneNumberMapper:
-    def __init__(self, region: str = 'us-east-1', profile: Optional[str] = None):
+    def __init__(self, region: str = 'us-east-1', profile: Optional[str] = None, session: Optional[boto3.Session] = None,
+                 client_config: Optional[Config] = None):
         """
         Initialize the Phone Number Mapper
         
         Args:
             region: AWS region
             profile: AWS profile name (optional)
+            session: Existing boto3 session to create the client from (profile is ignored when given)
+            client_config: botocore client configuration (optional)
         """
         self.region = region
         
         # Initialize AWS session and client
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        self.connect_client = session.client('connect', region_name=region)
+        if session is None:
+            session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        self.connect_client = session.client('connect', region_name=region, config=client_config)
         
         logger.info(f"Initialized phone number mapper in region: {region}")
     
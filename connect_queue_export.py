@@ -10,6 +10,7 @@ import logging
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError, BotoCoreError
 
 # Configure logging
@@ -23,6 +24,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Line drawn above and below the run start/end markers
+RUN_SEPARATOR = "=" * 80
+
 def log_run_separator(script_name: str, action: str = "START"):
     """
     Log a clear separator for run identification
@@ -31,21 +35,17 @@ def log_run_separator(script_name: str, action: str = "START"):
         script_name: Name of the script
         action: START or END
     """
-    separator = "=" * 80
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     
+    # One record per separator, so the block stays together in the log
     if action == "START":
-        logger.info(separator)
-        logger.info(f">> {script_name} - RUN STARTED at {timestamp}")
-        logger.info(separator)
+        logger.info(f"{RUN_SEPARATOR}\n>> {script_name} - RUN STARTED at {timestamp}\n{RUN_SEPARATOR}")
     elif action == "END":
-        logger.info(separator)
-        logger.info(f"<< {script_name} - RUN COMPLETED at {timestamp}")
-        logger.info(separator)
-        logger.info("")  # Empty line for visual separation
+        logger.info(f"{RUN_SEPARATOR}\n<< {script_name} - RUN COMPLETED at {timestamp}\n{RUN_SEPARATOR}\n")  # Trailing blank line for visual separation
 
 class ConnectQueueExporter:
-    def __init__(self, instance_id: str, bu_tag_value: str, region: str = 'us-east-1', profile: Optional[str] = None, queue_prefix: Optional[str] = None):
+    def __init__(self, instance_id: str, bu_tag_value: str, region: str = 'us-east-1', profile: Optional[str] = None, queue_prefix: Optional[str] = None,
+                 session: Optional[boto3.Session] = None, client_config: Optional[Config] = None):
         """
         Initialize the Connect Queue Exporter with BU tag and queue name filtering
         
@@ -55,6 +55,8 @@ class ConnectQueueExporter:
             region: AWS region
             profile: AWS profile name (optional)
             queue_prefix: Queue name prefix to filter (e.g., "Q_QC_" to match queues starting with Q_QC_)
+            session: Existing boto3 session to create the client from (profile is ignored when given)
+            client_config: botocore client configuration (optional)
         """
         self.instance_id = instance_id
         self.bu_tag_value = bu_tag_value
@@ -62,8 +64,12 @@ class ConnectQueueExporter:
         self.region = region
         
         # Initialize AWS session and client
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        self.connect_client = session.client('connect', region_name=region)
+        if session is None:
+            session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        self.connect_client = session.client('connect', region_name=region, config=client_config)
+        
+        # Contents of the most recent export, so callers can use it without re-reading the file
+        self.last_export_data = None
         
         if queue_prefix:
             logger.info(f"Initialized queue exporter for instance: {instance_id}, BU: {bu_tag_value}, Queue prefix: {queue_prefix} in region: {region}")
@@ -382,6 +388,7 @@ class ConnectQueueExporter:
         
         # Log run start
         log_run_separator("QUEUE EXPORT", "START")
+        self.last_export_data = None
         
         if self.queue_prefix:
             logger.info(f"Starting cache-optimized queue export for BU tag: {self.bu_tag_value}, Queue prefix: {self.queue_prefix} (standard queues only)...")
@@ -468,15 +475,14 @@ class ConnectQueueExporter:
             'BUTagValue': self.bu_tag_value,
             'QueuePrefix': self.queue_prefix,
             'ExportTimestamp': datetime.utcnow().isoformat(),
-            'TotalQueuesScanned': len(all_queues),
+            'TotalQueuesScanned': len(queue_cache),
             'MatchingQueues': len(exported_queues),
             'SuccessfulExports': len(exported_queues),
             'FailedExports': len(failed_exports),
             'Queues': exported_queues,
             'FailedQueues': failed_exports
         }
-        
-
+        self.last_export_data = export_data
         
         # Write to file
         try:
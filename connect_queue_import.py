@@ -8,7 +8,6 @@ import boto3
 import json
 import logging
 import time
-from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from botocore.exceptions import ClientError, BotoCoreError
 
@@ -23,6 +22,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Line drawn above and below the run start/end markers
+RUN_SEPARATOR = "=" * 80
+
 def log_run_separator(script_name: str, action: str = "START"):
     """
     Log a clear separator for run identification
@@ -31,18 +33,13 @@ def log_run_separator(script_name: str, action: str = "START"):
         script_name: Name of the script
         action: START or END
     """
-    separator = "=" * 80
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     
+    # One record per separator, so the block stays together in the log
     if action == "START":
-        logger.info(separator)
-        logger.info(f">> {script_name} - RUN STARTED at {timestamp}")
-        logger.info(separator)
+        logger.info(f"{RUN_SEPARATOR}\n>> {script_name} - RUN STARTED at {timestamp}\n{RUN_SEPARATOR}")
     elif action == "END":
-        logger.info(separator)
-        logger.info(f"<< {script_name} - RUN COMPLETED at {timestamp}")
-        logger.info(separator)
-        logger.info("")  # Empty line for visual separation
+        logger.info(f"{RUN_SEPARATOR}\n<< {script_name} - RUN COMPLETED at {timestamp}\n{RUN_SEPARATOR}\n")  # Trailing blank line for visual separation
 
 class ConnectQueueImporter:
     def __init__(self, instance_id: str, region: str = 'us-east-1', profile: Optional[str] = None, phone_number_mapping: Optional[Dict[str, str]] = None):
@@ -7,11 +7,17 @@ Exports all quick connects with complete configurations from an Amazon Connect i
 import boto3
 import json
 import logging
+import os
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from botocore.exceptions import ClientError, BotoCoreError
 
+try:
+    import zstandard as zstd
+except ImportError:  # Optional - only needed for .zst compressed exports
+    zstd = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +29,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Line drawn above and below the run start/end markers
+RUN_SEPARATOR = "=" * 80
+
 def log_run_separator(script_name: str, action: str = "START"):
     """
     Log a clear separator for run identification
@@ -31,18 +40,13 @@ def log_run_separator(script_name: str, action: str = "START"):
         script_name: Name of the script
         action: START or END
     """
-    separator = "=" * 80
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     
+    # One record per separator, so the block stays together in the log
     if action == "START":
-        logger.info(separator)
-        logger.info(f">> {script_name} - RUN STARTED at {timestamp}")
-        logger.info(separator)
+        logger.info(f"{RUN_SEPARATOR}\n>> {script_name} - RUN STARTED at {timestamp}\n{RUN_SEPARATOR}")
     elif action == "END":
-        logger.info(separator)
-        logger.info(f"<< {script_name} - RUN COMPLETED at {timestamp}")
-        logger.info(separator)
-        logger.info("")  # Empty line for visual separation
+        logger.info(f"{RUN_SEPARATOR}\n<< {script_name} - RUN COMPLETED at {timestamp}\n{RUN_SEPARATOR}\n")  # Trailing blank line for visual separation
 
 class ConnectQuickConnectExporter:
     def __init__(self, instance_id: str, region: str = 'us-east-1', profile: Optional[str] = None):
@@ -111,12 +115,13 @@ class ConnectQuickConnectExporter:
             logger.error(f"Unexpected error while fetching quick connects: {e}")
             raise
     
-    def get_quick_connect_details(self, quick_connect_id: str) -> Dict:
+    def get_quick_connect_details(self, quick_connect_id: str, export_ts: Optional[str] = None) -> Dict:
         """
         Get detailed quick connect information including all configurations
         
         Args:
             quick_connect_id: Quick Connect ID to fetch details for
+            export_ts: Export timestamp to stamp the item with (default: now)
             
         Returns:
             Complete quick connect data
@@ -148,7 +153,7 @@ class ConnectQuickConnectExporter:
             complete_profile = {
                 'QuickConnect': quick_connect_data,
                 'Tags': tags,
-                'ExportTimestamp': datetime.utcnow().isoformat()
+                'ExportTimestamp': export_ts or datetime.now(timezone.utc).isoformat()
             }
             
             return complete_profile
@@ -173,10 +178,22 @@ class ConnectQuickConnectExporter:
         # Log run start
         log_run_separator("QUICK CONNECT EXPORT", "START")
         
+        # Single export timestamp shared by the file and every exported item in this run
+        export_ts = datetime.now(timezone.utc).isoformat()
+        
         if not output_file:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = f"connect_quick_connects_export_{self.instance_id}_{timestamp}.json"
         
+        # Failures are streamed to a sidecar JSON Lines file, which is only opened on the first
+        # failure; remove one left by an earlier run to this path so it can't be mistaken for ours
+        failed_file = f"{output_file}.failed.jsonl"
+        try:
+            os.remove(failed_file)
+            logger.info(f"Removed failure details from a previous run: {failed_file}")
+        except FileNotFoundError:
+            pass
+        
         logger.info("Starting quick connect export process...")
         
         # Get all quick connects
@@ -188,49 +205,68 @@ class ConnectQuickConnectExporter:
             return output_file
         
         exported_quick_connects = []
-        failed_exports = []
         
-        for i, qc_summary in enumerate(quick_connects, 1):
-            qc_id = qc_summary['Id']
-            qc_name = qc_summary.get('Name', 'Unknown')
-            
-            try:
-                logger.info(f"Exporting quick connect {i}/{len(quick_connects)}: {qc_name} ({qc_id})")
-                
-                qc_details = self.get_quick_connect_details(qc_id)
-                exported_quick_connects.append(qc_details)
+        # Only the failure count is kept in memory; the details go to the sidecar file
+        failed_fp = None
+        failed_count = 0
+        
+        try:
+            for i, qc_summary in enumerate(quick_connects, 1):
+                qc_id = qc_summary['Id']
+                qc_name = qc_summary.get('Name', 'Unknown')
                 
-                # Rate limiting
-                if i % 10 == 0:
-                    time.sleep(1)
+                try:
+                    logger.info(f"Exporting quick connect {i}/{len(quick_connects)}: {qc_name} ({qc_id})")
+                    
+                    qc_details = self.get_quick_connect_details(qc_id, export_ts)
+                    exported_quick_connects.append(qc_details)
                     
-            except Exception as e:
-                logger.error(f"Failed to export quick connect {qc_name} ({qc_id}): {e}")
-                failed_exports.append({
-                    'QuickConnectId': qc_id,
-                    'Name': qc_name,
-                    'Error': str(e)
-                })
+                    # Rate limiting
+                    if i % 10 == 0:
+                        time.sleep(1)
+                        
+                except Exception as e:
+                    logger.error(f"Failed to export quick connect {qc_name} ({qc_id}): {e}")
+                    if failed_fp is None:
+                        failed_fp = open(failed_file, 'w', encoding='utf-8')
+                    failed_fp.write(json.dumps({
+                        'QuickConnectId': qc_id,
+                        'Name': qc_name,
+                        'Error': str(e)
+                    }) + '\n')
+                    failed_count += 1
+        finally:
+            if failed_fp is not None:
+                failed_fp.close()
         
         # Prepare export data
         export_data = {
             'InstanceId': self.instance_id,
-            'ExportTimestamp': datetime.utcnow().isoformat(),
+            'ExportTimestamp': export_ts,
             'TotalQuickConnects': len(quick_connects),
             'SuccessfulExports': len(exported_quick_connects),
-            'FailedExports': len(failed_exports),
+            'FailedExports': failed_count,
             'QuickConnects': exported_quick_connects,
-            'FailedQuickConnects': failed_exports
+            'FailedQuickConnectsFile': failed_file if failed_count else None
         }
         
-        # Write to file
+        # Write to file (zstd-compressed when the output path ends with .zst)
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, default=str)
+            if output_file.endswith('.zst'):
+                if zstd is None:
+                    raise RuntimeError("zstandard is required for .zst exports (pip install zstandard)")
+                cctx = zstd.ZstdCompressor(level=3, threads=-1)
+                with open(output_file, 'wb') as raw, cctx.stream_writer(raw) as f:
+                    f.write(json.dumps(export_data, default=str).encode('utf-8'))
+            else:
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    json.dump(export_data, f, indent=2, default=str)
             
             logger.info(f"Export completed successfully!")
             logger.info(f"Exported {len(exported_quick_connects)} quick connects to {output_file}")
-            logger.info(f"Failed exports: {len(failed_exports)}")
+            logger.info(f"Failed exports: {failed_count}")
+            if failed_count:
+                logger.info(f"Failure details written to {failed_file}")
             
             # Log run end
             log_run_separator("QUICK CONNECT EXPORT", "END")
@@ -249,7 +285,7 @@ def main():
     parser.add_argument('--instance-id', required=True, help='Amazon Connect instance ID')
     parser.add_argument('--region', default='us-east-1', help='AWS region')
     parser.add_argument('--profile', help='AWS profile name')
-    parser.add_argument('--output', help='Output file path')
+    parser.add_argument('--output', help='Output file path (use a .json.zst suffix for zstd-compressed output)')
     
     args = parser.parse_args()
     
@@ -8,10 +8,19 @@ import boto3
 import json
 import logging
 import time
-from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from botocore.exceptions import ClientError, BotoCoreError
 
+try:
+    import zstandard as zstd
+except ImportError:  # Optional - only needed for .zst compressed exports
+    zstd = None
+
+try:
+    import orjson
+except ImportError:  # Optional - faster JSON decoding, falls back to json
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +32,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Line drawn above and below the run start/end markers
+RUN_SEPARATOR = "=" * 80
+
 def log_run_separator(script_name: str, action: str = "START"):
     """
     Log a clear separator for run identification
@@ -31,18 +43,13 @@ def log_run_separator(script_name: str, action: str = "START"):
         script_name: Name of the script
         action: START or END
     """
-    separator = "=" * 80
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     
+    # One record per separator, so the block stays together in the log
     if action == "START":
-        logger.info(separator)
-        logger.info(f">> {script_name} - RUN STARTED at {timestamp}")
-        logger.info(separator)
+        logger.info(f"{RUN_SEPARATOR}\n>> {script_name} - RUN STARTED at {timestamp}\n{RUN_SEPARATOR}")
     elif action == "END":
-        logger.info(separator)
-        logger.info(f"<< {script_name} - RUN COMPLETED at {timestamp}")
-        logger.info(separator)
-        logger.info("")  # Empty line for visual separation
+        logger.info(f"{RUN_SEPARATOR}\n<< {script_name} - RUN COMPLETED at {timestamp}\n{RUN_SEPARATOR}\n")  # Trailing blank line for visual separation
 
 class ConnectQuickConnectImporter:
     def __init__(self, instance_id: str, region: str = 'us-east-1', profile: Optional[str] = None):
@@ -65,7 +72,7 @@ class ConnectQuickConnectImporter:
     
     def load_export_data(self, export_file: str) -> Dict:
         """
-        Load exported quick connect data from JSON file
+        Load exported quick connect data from JSON file (plain or .zst compressed)
         
         Args:
             export_file: Path to the export file
@@ -74,8 +81,17 @@ class ConnectQuickConnectImporter:
             Parsed export data
         """
         try:
-            with open(export_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if export_file.endswith('.zst'):
+                if zstd is None:
+                    raise RuntimeError("zstandard is required to read .zst exports (pip install zstandard)")
+                with open(export_file, 'rb') as raw, zstd.ZstdDecompressor().stream_reader(raw) as reader:
+                    raw_json = reader.read()
+            else:
+                with open(export_file, 'rb') as f:
+                    raw_json = f.read()
+            
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so either is handled below
+            data = orjson.loads(raw_json) if orjson is not None else json.loads(raw_json)
             
             logger.info(f"Loaded export data from {export_file}")
             logger.info(f"Total quick connects in export: {data.get('TotalQuickConnects', 0)}")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Adaptive Rate Limiter for Amazon Connect API calls
+Shared by the migration scripts to back off when AWS throttles instead of sleeping for fixed intervals.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+THROTTLING_ERROR_CODES = ('ThrottlingException', 'TooManyRequestsException')
+
+# botocore retry settings for clients whose calls go through AdaptiveRateLimiter. The
+# limiter owns throttling backoff, so botocore only gets a couple of quick retries for
+# transient network/5xx errors; stacking its adaptive mode (10 attempts) under the
+# limiter's 8 turned one throttled call into up to 80 requests.
+LIMITED_CLIENT_RETRIES = {'mode': 'standard', 'max_attempts': 3}
+
+class AdaptiveRateLimiter:
+    """
+    Bounds in-flight API calls and adapts the bound to observed throttling.
+
+    The concurrency limit is halved whenever AWS throttles a call and grows by one
+    after a run of successful calls. Throttled calls are retried with exponential
+    backoff and +/-25% jitter; clients used with it should keep botocore's own retries
+    short (LIMITED_CLIENT_RETRIES) so the two layers don't multiply.
+    """
+
+    def __init__(self, max_concurrency: int = 32, min_concurrency: int = 1, base_delay: float = 0.5,
+                 max_delay: float = 20.0, max_attempts: int = 8, increase_after: int = 20):
+        """
+        Initialize the rate limiter
+
+        Args:
+            max_concurrency: Upper bound for concurrent calls
+            min_concurrency: Lower bound the limit can shrink to under throttling
+            base_delay: Initial backoff delay in seconds
+            max_delay: Maximum backoff delay in seconds
+            max_attempts: Attempts per call before a throttling error is raised
+            increase_after: Consecutive successes required to raise the limit by one
+        """
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.increase_after = increase_after
+
+        self._limit = max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    @property
+    def current_limit(self) -> int:
+        """Current concurrency limit"""
+        return self._limit
+
+    def _acquire(self):
+        with self._condition:
+            while self._in_flight >= self._limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def _release(self, throttled: bool):
+        with self._condition:
+            self._in_flight -= 1
+
+            if throttled:
+                self._successes = 0
+                self._limit = max(self.min_concurrency, self._limit // 2)
+            else:
+                self._successes += 1
+                if self._successes >= self.increase_after and self._limit < self.max_concurrency:
+                    self._limit += 1
+                    self._successes = 0
+
+            self._condition.notify_all()
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Call an AWS API function, retrying with backoff when it is throttled
+
+        Args:
+            func: Client method to call
+            *args, **kwargs: Arguments passed to the client method
+
+        Returns:
+            The client method's response
+        """
+        for attempt in range(self.max_attempts):
+            self._acquire()
+            throttled = False
+
+            try:
+                return func(*args, **kwargs)
+            except ClientError as e:
+                throttled = e.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+                if not throttled or attempt + 1 >= self.max_attempts:
+                    raise
+            finally:
+                self._release(throttled)
+
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.75, 1.25)
+            logger.warning(f"Throttled by AWS, retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_attempts}, "
+                           f"concurrency limit {self._limit})")
+            time.sleep(delay)
+
+class TokenBucket:
+    """
+    Paces calls to a steady rate with a bounded burst.
+
+    Each call takes one token; tokens refill continuously at rate_per_sec up to
+    capacity. Pacing every call (rather than sleeping between batches) keeps worker
+    threads busy on the happy path while preventing bursts from overrunning the quota.
+    """
+
+    def __init__(self, rate_per_sec: float, capacity: int = 1):
+        """
+        Initialize the token bucket
+
+        Args:
+            rate_per_sec: Sustained calls per second
+            capacity: Maximum burst size
+        """
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate_per_sec)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate_per_sec
+
+            time.sleep(wait)
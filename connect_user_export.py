@@ -6,24 +6,82 @@ Handles pagination and large datasets (10K+ users).
 """
 
 import boto3
+import functools
+import gzip
 import json
 import logging
 import time
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timezone
+from itertools import islice
 from typing import Dict, List, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError, BotoCoreError
+from connect_rate_limiter import LIMITED_CLIENT_RETRIES, AdaptiveRateLimiter
+
+try:
+    import orjson
+except ImportError:  # Optional - faster JSON encoding, falls back to json
+    orjson = None
+
+try:
+    import zstandard as zstd
+except ImportError:  # Optional - only needed for .zst compressed exports
+    zstd = None
+
+try:
+    from tqdm import tqdm
+except ImportError:  # Optional - progress bar, falls back to periodic log lines
+    tqdm = None
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('connect_export.log', encoding='utf-8'),
+        logging.FileHandler('connect_export.log', encoding='utf-8', delay=True),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Users between progress log lines when tqdm is not installed
+PROGRESS_LOG_INTERVAL = 500
+
+# Largest MaxResults the Connect list_* APIs accept
+LIST_PAGE_SIZE = 1000
+
+def _json_default(obj):
+    """Encode the types json can't, writing dates the way orjson does (RFC 3339, naive as UTC)"""
+    if isinstance(obj, datetime):
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return obj.isoformat()
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return str(obj)
+
+def dumps_json(obj) -> bytes:
+    """
+    Serialize an object to UTF-8 JSON bytes, using orjson when available
+    
+    Both paths write datetimes in the same RFC 3339 format, so the export doesn't
+    depend on which library is installed.
+    
+    Args:
+        obj: Object to serialize (datetimes as RFC 3339, other unknown types stringified)
+        
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, default=_json_default).encode('utf-8')
+
+# Line drawn above and below the run start/end markers
+RUN_SEPARATOR = "=" * 80
+
 def log_run_separator(script_name: str, action: str = "START"):
     """
     Log a clear separator for run identification
@@ -32,21 +90,17 @@ def log_run_separator(script_name: str, action: str = "START"):
         script_name: Name of the script
         action: START or END
     """
-    separator = "=" * 80
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     
+    # One record per separator, so the block stays together in the log
     if action == "START":
-        logger.info(separator)
-        logger.info(f">> {script_name} - RUN STARTED at {timestamp}")
-        logger.info(separator)
+        logger.info(f"{RUN_SEPARATOR}\n>> {script_name} - RUN STARTED at {timestamp}\n{RUN_SEPARATOR}")
     elif action == "END":
-        logger.info(separator)
-        logger.info(f"<< {script_name} - RUN COMPLETED at {timestamp}")
-        logger.info(separator)
-        logger.info("")  # Empty line for visual separation
+        logger.info(f"{RUN_SEPARATOR}\n<< {script_name} - RUN COMPLETED at {timestamp}\n{RUN_SEPARATOR}\n")  # Trailing blank line for visual separation
 
 class ConnectUserExporter:
-    def __init__(self, instance_id: str, region: str = 'us-east-1', profile: Optional[str] = None):
+    def __init__(self, instance_id: str, region: str = 'us-east-1', profile: Optional[str] = None,
+                 max_workers: int = 32, session: Optional[boto3.Session] = None):
         """
         Initialize the Connect User Exporter
         
@@ -54,13 +108,38 @@ class ConnectUserExporter:
             instance_id: Amazon Connect instance ID
             region: AWS region
             profile: AWS profile name (optional)
+            max_workers: Number of users fetched concurrently during export
+            session: Existing boto3 session to create the client from (profile is ignored when given)
         """
         self.instance_id = instance_id
         self.region = region
+        self.max_workers = max_workers
         
-        # Initialize AWS session and client
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        self.connect_client = session.client('connect', region_name=region)
+        # Initialize AWS session and client. A single client is shared by all export
+        # worker threads (boto3 clients are thread-safe; per-thread sessions are much
+        # slower), so the connection pool is sized above the worker count and kept alive.
+        if session is None:
+            session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        client_config = Config(
+            max_pool_connections=max(128, max_workers * 2),
+            retries=LIMITED_CLIENT_RETRIES,
+            tcp_keepalive=True
+        )
+        self.connect_client = session.client('connect', region_name=region, config=client_config)
+        
+        # Client-side limiter: backs off and reduces concurrency when AWS throttles
+        self.rate_limiter = AdaptiveRateLimiter(max_concurrency=max_workers)
+        
+        # Routing, security and hierarchy resources are shared by many users, so cache
+        # their describe results per exporter instance instead of re-fetching per user
+        self._describe_routing_profile = functools.lru_cache(maxsize=4096)(self._describe_routing_profile_impl)
+        self._describe_security_profile = functools.lru_cache(maxsize=4096)(self._describe_security_profile_impl)
+        self._describe_hierarchy_group = functools.lru_cache(maxsize=4096)(self._describe_hierarchy_group_impl)
+        
+        # Resources preloaded by _preload_resources, keyed by ID
+        self._rp_by_id = {}
+        self._sp_by_id = {}
+        self._hg_by_id = {}
         
         logger.info(f"Initialized exporter for instance: {instance_id} in region: {region}")
     
@@ -78,29 +157,26 @@ class ConnectUserExporter:
         try:
             while True:
                 page_count += 1
-                logger.info(f"Fetching users page {page_count}...")
+                logger.info("Fetching users page %d...", page_count)
                 
                 params = {
                     'InstanceId': self.instance_id,
-                    'MaxResults': 1000  # Maximum allowed by API
+                    'MaxResults': LIST_PAGE_SIZE  # Maximum allowed by API
                 }
                 
                 if next_token:
                     params['NextToken'] = next_token
                 
-                response = self.connect_client.list_users(**params)
+                response = self.rate_limiter.call(self.connect_client.list_users, **params)
                 
                 page_users = response.get('UserSummaryList', [])
                 users.extend(page_users)
                 
-                logger.info(f"Retrieved {len(page_users)} users from page {page_count}")
+                logger.info("Retrieved %d users from page %d", len(page_users), page_count)
                 
                 next_token = response.get('NextToken')
                 if not next_token:
                     break
-                
-                # Rate limiting to avoid throttling
-                time.sleep(0.1)
             
             logger.info(f"Total users retrieved: {len(users)}")
             return users
@@ -112,6 +188,79 @@ class ConnectUserExporter:
             logger.error(f"Unexpected error while fetching users: {e}")
             raise
     
+    def _describe_routing_profile_impl(self, routing_profile_id: str) -> Dict:
+        """Describe a routing profile (cached per instance via _describe_routing_profile)"""
+        response = self.rate_limiter.call(
+            self.connect_client.describe_routing_profile,
+            InstanceId=self.instance_id,
+            RoutingProfileId=routing_profile_id
+        )
+        return response['RoutingProfile']
+    
+    def _describe_security_profile_impl(self, security_profile_id: str) -> Dict:
+        """Describe a security profile (cached per instance via _describe_security_profile)"""
+        response = self.rate_limiter.call(
+            self.connect_client.describe_security_profile,
+            SecurityProfileId=security_profile_id,
+            InstanceId=self.instance_id
+        )
+        return response['SecurityProfile']
+    
+    def _describe_hierarchy_group_impl(self, hierarchy_group_id: str) -> Dict:
+        """Describe a user hierarchy group (cached per instance via _describe_hierarchy_group)"""
+        response = self.rate_limiter.call(
+            self.connect_client.describe_user_hierarchy_group,
+            HierarchyGroupId=hierarchy_group_id,
+            InstanceId=self.instance_id
+        )
+        return response['HierarchyGroup']
+    
+    def _list_resource_ids(self, operation: str, result_key: str) -> List[str]:
+        """List the IDs of every resource returned by a paginated list_* operation"""
+        resource_ids = []
+        paginator = self.connect_client.get_paginator(operation)
+        for page in paginator.paginate(InstanceId=self.instance_id, PaginationConfig={'PageSize': LIST_PAGE_SIZE}):
+            resource_ids.extend(item['Id'] for item in page.get(result_key, []))
+        return resource_ids
+    
+    def _preload_resources(self):
+        """
+        Describe every routing profile, security profile and hierarchy group up front
+        
+        Instances have far fewer of these than users, so fetching them once (concurrently)
+        turns get_user_details into a single describe_user call plus dictionary lookups.
+        A resource type that can't be listed (e.g. missing list permission) isn't preloaded;
+        get_user_details then describes those resources on demand instead.
+        """
+        resource_types = [
+            ('list_routing_profiles', 'RoutingProfileSummaryList', self._describe_routing_profile, self._rp_by_id),
+            ('list_security_profiles', 'SecurityProfileSummaryList', self._describe_security_profile, self._sp_by_id),
+            ('list_user_hierarchy_groups', 'UserHierarchyGroupSummaryList', self._describe_hierarchy_group, self._hg_by_id)
+        ]
+        
+        logger.info("Preloading routing profiles, security profiles and hierarchy groups...")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {}
+            for operation, result_key, describe, resources_by_id in resource_types:
+                try:
+                    resource_ids = self._list_resource_ids(operation, result_key)
+                except (ClientError, BotoCoreError) as e:
+                    logger.warning(f"Could not preload via {operation}, describing on demand instead: {e}")
+                    continue
+                for resource_id in resource_ids:
+                    futures[executor.submit(describe, resource_id)] = (resource_id, resources_by_id)
+            
+            for future in as_completed(futures):
+                resource_id, resources_by_id = futures[future]
+                try:
+                    resources_by_id[resource_id] = future.result()
+                except (ClientError, BotoCoreError) as e:
+                    logger.warning(f"Could not preload resource {resource_id}: {e}")
+        
+        logger.info(f"Preloaded {len(self._rp_by_id)} routing profiles, {len(self._sp_by_id)} security profiles "
+                    f"and {len(self._hg_by_id)} hierarchy groups")
+    
     def get_user_details(self, user_id: str) -> Dict:
         """
         Get detailed user information including all configurations
@@ -124,48 +273,43 @@ class ConnectUserExporter:
         """
         try:
             # Get basic user info
-            user_response = self.connect_client.describe_user(
+            user_response = self.rate_limiter.call(
+                self.connect_client.describe_user,
                 UserId=user_id,
                 InstanceId=self.instance_id
             )
             
             user_data = user_response['User']
             
-            # Get user hierarchy group if assigned
-            hierarchy_group = None
-            if user_data.get('HierarchyGroupId'):
+            # Get user hierarchy group if assigned (preloaded, described on a miss)
+            hierarchy_group_id = user_data.get('HierarchyGroupId')
+            hierarchy_group = self._hg_by_id.get(hierarchy_group_id) if hierarchy_group_id else None
+            if hierarchy_group_id and hierarchy_group is None:
                 try:
-                    hierarchy_response = self.connect_client.describe_user_hierarchy_group(
-                        HierarchyGroupId=user_data['HierarchyGroupId'],
-                        InstanceId=self.instance_id
-                    )
-                    hierarchy_group = hierarchy_response['HierarchyGroup']
+                    hierarchy_group = self._describe_hierarchy_group(hierarchy_group_id)
                 except ClientError as e:
-                    logger.warning(f"Could not fetch hierarchy group for user {user_id}: {e}")
+                    logger.warning("Could not fetch hierarchy group for user %s: %s", user_id, e)
             
-            # Get routing profile details
-            routing_profile = None
-            if user_data.get('RoutingProfileId'):
+            # Get routing profile details (preloaded, described on a miss)
+            routing_profile_id = user_data.get('RoutingProfileId')
+            routing_profile = self._rp_by_id.get(routing_profile_id) if routing_profile_id else None
+            if routing_profile_id and routing_profile is None:
                 try:
-                    routing_response = self.connect_client.describe_routing_profile(
-                        InstanceId=self.instance_id,
-                        RoutingProfileId=user_data['RoutingProfileId']
-                    )
-                    routing_profile = routing_response['RoutingProfile']
+                    routing_profile = self._describe_routing_profile(routing_profile_id)
                 except ClientError as e:
-                    logger.warning(f"Could not fetch routing profile for user {user_id}: {e}")
+                    logger.warning("Could not fetch routing profile for user %s: %s", user_id, e)
             
-            # Get security profile details
+            # Get security profile details (preloaded, described on a miss)
             security_profiles = []
             for security_profile_id in user_data.get('SecurityProfileIds', []):
+                security_profile = self._sp_by_id.get(security_profile_id)
+                if security_profile is not None:
+                    security_profiles.append(security_profile)
+                    continue
                 try:
-                    security_response = self.connect_client.describe_security_profile(
-                        SecurityProfileId=security_profile_id,
-                        InstanceId=self.instance_id
-                    )
-                    security_profiles.append(security_response['SecurityProfile'])
+                    security_profiles.append(self._describe_security_profile(security_profile_id))
                 except ClientError as e:
-                    logger.warning(f"Could not fetch security profile {security_profile_id} for user {user_id}: {e}")
+                    logger.warning("Could not fetch security profile %s for user %s: %s", security_profile_id, user_id, e)
             
             # Compile complete user profile
             complete_profile = {
@@ -179,10 +323,10 @@ class ConnectUserExporter:
             return complete_profile
             
         except ClientError as e:
-            logger.error(f"AWS API error while fetching user details for {user_id}: {e}")
+            logger.error("AWS API error while fetching user details for %s: %s", user_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error while fetching user details for {user_id}: {e}")
+            logger.error("Unexpected error while fetching user details for %s: %s", user_id, e)
             raise
     
     def export_users(self, output_file: str = None) -> str:
@@ -190,7 +334,7 @@ class ConnectUserExporter:
         Export all users with complete configurations
         
         Args:
-            output_file: Output file path (optional)
+            output_file: Output file path (optional); a .gz or .zst suffix writes a compressed export
             
         Returns:
             Path to the exported file
@@ -200,7 +344,7 @@ class ConnectUserExporter:
         
         if not output_file:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = f"connect_users_export_{self.instance_id}_{timestamp}.json"
+            output_file = f"connect_users_export_{self.instance_id}_{timestamp}.json.gz"
         
         logger.info("Starting user export process...")
         
@@ -212,49 +356,91 @@ class ConnectUserExporter:
             log_run_separator("USER EXPORT", "END")
             return output_file
         
-        exported_users = []
+        # Fetch shared resources once so per-user work is a single describe_user call
+        self._preload_resources()
+        
+        exported_count = 0
         failed_exports = []
         
-        for i, user_summary in enumerate(users, 1):
-            user_id = user_summary['Id']
-            username = user_summary.get('Username', 'Unknown')
+        # Stream each user record to the file as soon as it is ready, so the full
+        # export is never held in memory. Users are written in listing order.
+        try:
+            # Level 1 is enough: repeated keys and IDs compress well, and higher levels
+            # cost more CPU than they save in IO
+            if output_file.endswith('.gz'):
+                out = gzip.open(output_file, 'wb', compresslevel=1)
+            elif output_file.endswith('.zst'):
+                if zstd is None:
+                    raise RuntimeError("zstandard is required for .zst exports (pip install zstandard)")
+                out = zstd.ZstdCompressor(level=3).stream_writer(open(output_file, 'wb'), closefd=True)
+            else:
+                out = open(output_file, 'wb')
             
-            try:
-                logger.info(f"Exporting user {i}/{len(users)}: {username} ({user_id})")
+            with out as f:
+                f.write(b'{\n')
+                f.write(b'  "InstanceId": ' + dumps_json(self.instance_id) + b',\n')
+                f.write(b'  "ExportTimestamp": ' + dumps_json(datetime.utcnow().isoformat()) + b',\n')
+                f.write(f'  "TotalUsers": {len(users)},\n'.encode())
+                f.write(b'  "Users": [')
                 
-                user_details = self.get_user_details(user_id)
-                exported_users.append(user_details)
+                # Per-user lines are DEBUG; progress is shown as a bar (or a log line
+                # every PROGRESS_LOG_INTERVAL users when tqdm is not installed)
+                show_progress = logger.isEnabledFor(logging.INFO)
+                progress = tqdm(total=len(users), unit='user', desc='Exporting users') if tqdm and show_progress else None
                 
-                # Rate limiting
-                if i % 10 == 0:
-                    time.sleep(1)
+                # Each user needs a describe call, so overlap them across a thread pool. Only
+                # 2 * max_workers are in flight at once and each is dropped from the window
+                # once written, so finished user records don't pile up in their futures.
+                max_in_flight = self.max_workers * 2
+                users_iter = iter(users)
+                in_flight = deque()
+                
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    for user_summary in islice(users_iter, max_in_flight):
+                        in_flight.append((executor.submit(self.get_user_details, user_summary['Id']), user_summary))
                     
-            except Exception as e:
-                logger.error(f"Failed to export user {username} ({user_id}): {e}")
-                failed_exports.append({
-                    'UserId': user_id,
-                    'Username': username,
-                    'Error': str(e)
-                })
-        
-        # Prepare export data
-        export_data = {
-            'InstanceId': self.instance_id,
-            'ExportTimestamp': datetime.utcnow().isoformat(),
-            'TotalUsers': len(users),
-            'SuccessfulExports': len(exported_users),
-            'FailedExports': len(failed_exports),
-            'Users': exported_users,
-            'FailedUsers': failed_exports
-        }
-        
-        # Write to file
-        try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, default=str)
+                    for i in range(1, len(users) + 1):
+                        future, user_summary = in_flight.popleft()
+                        
+                        # Top the window back up before waiting on the oldest user
+                        next_summary = next(users_iter, None)
+                        if next_summary is not None:
+                            in_flight.append((executor.submit(self.get_user_details, next_summary['Id']), next_summary))
+                        
+                        user_id = user_summary['Id']
+                        username = user_summary.get('Username', 'Unknown')
+                        
+                        try:
+                            user_details = future.result()
+                        except Exception as e:
+                            logger.error("Failed to export user %s (%s): %s", username, user_id, e)
+                            failed_exports.append({
+                                'UserId': user_id,
+                                'Username': username,
+                                'Error': str(e)
+                            })
+                        else:
+                            f.write(b',\n    ' if exported_count else b'\n    ')
+                            f.write(dumps_json(user_details))
+                            exported_count += 1
+                            logger.debug("Exported user %d/%d: %s (%s)", i, len(users), username, user_id)
+                        
+                        if progress is not None:
+                            progress.update(1)
+                        elif show_progress and (i % PROGRESS_LOG_INTERVAL == 0 or i == len(users)):
+                            logger.info("Processed %d/%d users", i, len(users))
+                
+                if progress is not None:
+                    progress.close()
+                
+                f.write(b'\n  ],\n')
+                f.write(f'  "SuccessfulExports": {exported_count},\n'.encode())
+                f.write(f'  "FailedExports": {len(failed_exports)},\n'.encode())
+                f.write(b'  "FailedUsers": ' + dumps_json(failed_exports) + b'\n')
+                f.write(b'}\n')
             
             logger.info(f"Export completed successfully!")
-            logger.info(f"Exported {len(exported_users)} users to {output_file}")
+            logger.info(f"Exported {exported_count} users to {output_file}")
             logger.info(f"Failed exports: {len(failed_exports)}")
             
             # Log run end
@@ -266,31 +452,83 @@ class ConnectUserExporter:
             logger.error(f"Failed to write export file: {e}")
             raise
 
+def _export_instance(instance_id: str, region: str, profile: Optional[str], output_file: Optional[str],
+                     max_workers: int, quiet: bool) -> str:
+    """
+    Export one instance's users; runs in a worker process for multi-instance exports
+    
+    Each process builds its own session and client - boto3 sessions can't be shared
+    across process boundaries.
+    
+    Returns:
+        Path to the exported file
+    """
+    if quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    
+    exporter = ConnectUserExporter(
+        instance_id=instance_id,
+        region=region,
+        profile=profile,
+        max_workers=max_workers
+    )
+    return exporter.export_users(output_file)
+
 def main():
     """Main function for command line usage"""
     import argparse
     
     parser = argparse.ArgumentParser(description='Export Amazon Connect user profiles')
-    parser.add_argument('--instance-id', required=True, help='Amazon Connect instance ID')
+    parser.add_argument('--instance-id', required=True, action='append', dest='instance_ids',
+                        help='Amazon Connect instance ID (repeat to export several instances in parallel)')
     parser.add_argument('--region', default='us-east-1', help='AWS region')
     parser.add_argument('--profile', help='AWS profile name')
-    parser.add_argument('--output', help='Output file path')
+    parser.add_argument('--output', help='Output file path (default: connect_users_export_<instance>_<timestamp>.json.gz; use a .json.zst suffix for zstd or .json for uncompressed output)')
+    parser.add_argument('--workers', type=int, default=32, help='Number of users to fetch concurrently')
+    parser.add_argument('--processes', type=int,
+                        help='Most instances exported at once (default: all of them, one process each)')
+    parser.add_argument('--quiet', action='store_true', help='Only log warnings and errors (no progress output)')
     
     args = parser.parse_args()
     
+    if args.output and len(args.instance_ids) > 1:
+        parser.error("--output can only be used with a single --instance-id")
+    
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    
     try:
-        exporter = ConnectUserExporter(
-            instance_id=args.instance_id,
-            region=args.region,
-            profile=args.profile
-        )
-        
-        output_file = exporter.export_users(args.output)
-        print(f"Export completed: {output_file}")
+        if len(args.instance_ids) == 1:
+            output_file = _export_instance(args.instance_ids[0], args.region, args.profile, args.output,
+                                           args.workers, args.quiet)
+            print(f"Export completed: {output_file}")
+        else:
+            # Threads within one process share the GIL and TLS handshakes, so each
+            # instance is exported by its own process. The work is network-bound API
+            # calls, so the process count follows the instances, not the CPU count.
+            process_count = min(len(args.instance_ids), args.processes or len(args.instance_ids))
+            with ProcessPoolExecutor(max_workers=process_count) as executor:
+                futures = {
+                    executor.submit(_export_instance, instance_id, args.region, args.profile, None,
+                                    args.workers, args.quiet): instance_id
+                    for instance_id in args.instance_ids
+                }
+                
+                failed = False
+                for future in as_completed(futures):
+                    instance_id = futures[future]
+                    try:
+                        print(f"Export completed for {instance_id}: {future.result()}")
+                    except Exception as e:
+                        logger.error(f"Export failed for {instance_id}: {e}")
+                        failed = True
+            
+            if failed:
+                exit(1)
         
     except Exception as e:
         logger.error(f"Export failed: {e}")
         exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -8,22 +8,106 @@ Handles batch processing and large datasets (10K+ users).
 import boto3
 import json
 import logging
+import mmap
+import os
+import queue
+import threading
 import time
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from botocore.config import Config
 from botocore.exceptions import ClientError, BotoCoreError
+from connect_export_files import open_export_file
+from connect_rate_limiter import LIMITED_CLIENT_RETRIES, AdaptiveRateLimiter, TokenBucket
+
+try:
+    import orjson
+except ImportError:  # Optional - faster JSON decoding, falls back to json
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Optional - falls back to loading the whole export file
+    ijson = None
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('connect_import.log', encoding='utf-8'),
+        logging.FileHandler('connect_import.log', encoding='utf-8', delay=True),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Default number of concurrent create_user calls
+MAX_CONCURRENT_CREATES = 50
+
+# Largest MaxResults the Connect list_* APIs accept
+LIST_PAGE_SIZE = 1000
+
+# Uncompressed exports above this size are parsed from a memory map (orjson only)
+MMAP_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+# Default CreateUser pacing, matching Amazon Connect's default API quota (2 TPS, burst 5).
+# Raise these if the instance has an increased quota.
+DEFAULT_CREATE_USER_TPS = 2.0
+CREATE_USER_BURST = 5
+
+# Exported user fields passed through to create_user unchanged when present
+OPTIONAL_USER_FIELDS = ('IdentityInfo', 'PhoneConfig', 'DirectoryUserId', 'Tags')
+
+def get_security_profile_names(user_data: Dict) -> List[str]:
+    """
+    Get a user's unique security profile names, in export order
+    
+    Args:
+        user_data: User data from export
+        
+    Returns:
+        Security profile names (SecurityProfileName, or Name for older exports)
+    """
+    names = {}
+    for security_profile in user_data.get('SecurityProfiles', []):
+        # Handle different possible field names for security profile name
+        name = security_profile.get('SecurityProfileName') or security_profile.get('Name')
+        if name:
+            names[name] = None
+        else:
+            logger.error("Security profile missing name field. Available fields: %s", list(security_profile))
+    return list(names)
+
+# Line drawn above and below the run start/end markers
+RUN_SEPARATOR = "=" * 80
+
+@contextmanager
+def queued_logging():
+    """
+    Route the root logger's handlers through a queue and listener thread for a run
+    
+    Worker threads then only enqueue records while the listener owns the file/console
+    handlers, so concurrent creates never block on log I/O. The original handlers are
+    restored (and the queue drained) on exit.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    
+    # QueueHandler pre-formats only the message; the listener's handlers add the rest
+    root.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        root.handlers = handlers
+
 def log_run_separator(script_name: str, action: str = "START"):
     """
     Log a clear separator for run identification
@@ -32,21 +116,18 @@ def log_run_separator(script_name: str, action: str = "START"):
         script_name: Name of the script
         action: START or END
     """
-    separator = "=" * 80
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     
+    # One record per separator, so the block stays together in the log
     if action == "START":
-        logger.info(separator)
-        logger.info(f">> {script_name} - RUN STARTED at {timestamp}")
-        logger.info(separator)
+        logger.info(f"{RUN_SEPARATOR}\n>> {script_name} - RUN STARTED at {timestamp}\n{RUN_SEPARATOR}")
     elif action == "END":
-        logger.info(separator)
-        logger.info(f"<< {script_name} - RUN COMPLETED at {timestamp}")
-        logger.info(separator)
-        logger.info("")  # Empty line for visual separation
+        logger.info(f"{RUN_SEPARATOR}\n<< {script_name} - RUN COMPLETED at {timestamp}\n{RUN_SEPARATOR}\n")  # Trailing blank line for visual separation
 
 class ConnectUserImporter:
-    def __init__(self, instance_id: str, region: str = 'us-east-1', profile: Optional[str] = None):
+    def __init__(self, instance_id: str, region: str = 'us-east-1', profile: Optional[str] = None,
+                 max_workers: int = MAX_CONCURRENT_CREATES, max_pool_connections: Optional[int] = None,
+                 create_user_tps: Optional[float] = DEFAULT_CREATE_USER_TPS, session: Optional[boto3.Session] = None):
         """
         Initialize the Connect User Importer
         
@@ -54,13 +135,54 @@ class ConnectUserImporter:
             instance_id: Target Amazon Connect instance ID
             region: AWS region
             profile: AWS profile name (optional)
+            max_workers: Number of users to create concurrently
+            max_pool_connections: HTTP connection pool size (default: max(128, 2 * max_workers))
+            create_user_tps: Sustained create_user calls per second (None or 0 disables pacing)
+            session: Existing boto3 session to create the client from (profile is ignored when given)
         """
         self.instance_id = instance_id
         self.region = region
         
-        # Initialize AWS session and client
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        self.connect_client = session.client('connect', region_name=region)
+        # Initialize AWS session and client. A single client is shared by all import
+        # worker threads (boto3 clients are thread-safe; per-thread sessions are much
+        # slower), so the connection pool is sized above the create concurrency.
+        if session is None:
+            session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        
+        # Resolve credentials once on this thread, before any workers start, so the
+        # first concurrent calls don't all queue on the credential provider chain
+        # (e.g. an SSO or assume-role fetch). The client keeps this credentials object,
+        # so refreshable credentials still refresh when they near expiry.
+        credentials = session.get_credentials()
+        if credentials is not None:
+            credentials.get_frozen_credentials()
+        
+        client_config = Config(
+            max_pool_connections=max_pool_connections or max(128, max_workers * 2),
+            retries=LIMITED_CLIENT_RETRIES,
+            tcp_keepalive=True,
+            connect_timeout=5,
+            read_timeout=30
+        )
+        self.connect_client = session.client('connect', region_name=region, config=client_config)
+        
+        self.configure_creates(max_workers, create_user_tps)
+        self._routing_profile_lock = threading.Lock()
+        self._failed_routing_profiles = {}
+        
+        # Parameters shared by every create_user call
+        self._user_template = {'InstanceId': instance_id}
+        
+        # Per-username security profile IDs, resolved by analyze_security_profiles
+        self._resolved_security_profile_ids = {}
+        
+        # Security profile scan of the export from the last dry run, which an import of the
+        # same unchanged export can opt to reuse (see import_users)
+        self._dry_run_cache = None
+        
+        # Security profile names in the target, cached by get_existing_resources
+        self._security_profile_names = []
+        self._security_profile_names_logged = False
         
         # Cache for mapping old IDs to new IDs
         self.routing_profile_map = {}
@@ -69,9 +191,28 @@ class ConnectUserImporter:
         
         logger.info(f"Initialized importer for instance: {instance_id} in region: {region}")
     
+    def configure_creates(self, max_workers: int, create_user_tps: Optional[float]):
+        """
+        Set the create concurrency and pacing used by the next import_users call
+        
+        Lets one importer (and its client and connection pool) be reused across
+        configurations; the pool was sized for the worker count given to __init__.
+        
+        Args:
+            max_workers: Number of users to create concurrently
+            create_user_tps: Sustained create_user calls per second (None or 0 disables pacing)
+        """
+        self.max_workers = max_workers
+        
+        # Client-side limiter: backs off and reduces concurrency when AWS throttles
+        self.rate_limiter = AdaptiveRateLimiter(max_concurrency=max_workers)
+        
+        # Paces create_user to the account's quota so workers don't burst into throttling
+        self.create_user_bucket = TokenBucket(create_user_tps, CREATE_USER_BURST) if create_user_tps else None
+    
     def load_export_data(self, export_file: str) -> Dict:
         """
-        Load exported user data from JSON file
+        Load exported user data from JSON file (.json, or compressed .json.gz / .json.zst)
         
         Args:
             export_file: Path to the export file
@@ -80,8 +221,17 @@ class ConnectUserImporter:
             Parsed export data
         """
         try:
-            with open(export_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, handled below
+            if orjson is not None and not export_file.endswith(('.gz', '.zst')) and os.path.getsize(export_file) > MMAP_THRESHOLD_BYTES:
+                # Parse large uncompressed exports straight from a memory map rather than
+                # copying the whole file into a bytes object first
+                with open(export_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        data = orjson.loads(view)
+            else:
+                with open_export_file(export_file) as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if orjson is not None else json.loads(raw)
             
             logger.info(f"Loaded export data from {export_file}")
             logger.info(f"Total users in export: {data.get('TotalUsers', 0)}")
@@ -98,6 +248,90 @@ class ConnectUserImporter:
             logger.error(f"Error loading export file: {e}")
             raise
     
+    def iter_export_users(self, export_file: str) -> Iterator[Dict]:
+        """
+        Stream user records from an export file one at a time
+        
+        Uses ijson when it is installed so only one user is held in memory at a time;
+        otherwise falls back to loading the whole file with load_export_data.
+        
+        Args:
+            export_file: Path to the export file
+            
+        Yields:
+            User data dictionaries from the export's Users array
+        """
+        if ijson is None:
+            yield from self.load_export_data(export_file).get('Users', [])
+            return
+        
+        try:
+            with open_export_file(export_file) as f:
+                yield from ijson.items(f, 'Users.item', use_float=True)
+        except FileNotFoundError:
+            logger.error(f"Export file not found: {export_file}")
+            raise
+        except ijson.JSONError as e:
+            logger.error(f"Invalid JSON in export file: {e}")
+            raise
+    
+    def read_export_header(self, export_file: str) -> Dict:
+        """
+        Read the export's top-level fields that precede the Users array
+        
+        With ijson only the start of the file is parsed, so this is cheap even for
+        very large exports.
+        
+        Args:
+            export_file: Path to the export file
+            
+        Returns:
+            Header fields such as InstanceId, ExportTimestamp and TotalUsers
+        """
+        if ijson is None:
+            data = self.load_export_data(export_file)
+            return {key: value for key, value in data.items() if not isinstance(value, (list, dict))}
+        
+        header = {}
+        with open_export_file(export_file) as f:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if prefix == 'Users':
+                    break
+                if '.' not in prefix and prefix and event in ('string', 'number', 'boolean', 'null'):
+                    header[prefix] = value
+        return header
+    
+    def _paginate(self, op_name: str, result_key: str, **kwargs) -> Iterator[Dict]:
+        """
+        Yield every item from a list_* operation, following NextToken manually
+        
+        Calling the operation directly with the largest MaxResults avoids the paginator's
+        per-page overhead on instances with many resources.
+        
+        Args:
+            op_name: Connect client method name, e.g. 'list_routing_profiles'
+            result_key: Response key holding the page's items
+            **kwargs: Extra request parameters
+            
+        Yields:
+            Items from each page
+        """
+        operation = getattr(self.connect_client, op_name)
+        params = {'InstanceId': self.instance_id, 'MaxResults': LIST_PAGE_SIZE, **kwargs}
+        
+        while True:
+            response = self.rate_limiter.call(operation, **params)
+            yield from response.get(result_key, [])
+            
+            next_token = response.get('NextToken')
+            if not next_token:
+                break
+            params['NextToken'] = next_token
+    
+    def _list_all(self, op_name: str, result_key: str) -> List[Dict]:
+        """List every summary returned by a list_* operation"""
+        return list(self._paginate(op_name, result_key))
+    
     def get_existing_resources(self) -> Dict:
         """
         Get existing resources in the target instance for mapping
@@ -112,98 +346,128 @@ class ConnectUserImporter:
         }
         
         try:
-            # Get routing profiles
-            logger.info("Fetching existing routing profiles...")
-            routing_paginator = self.connect_client.get_paginator('list_routing_profiles')
-            for page in routing_paginator.paginate(InstanceId=self.instance_id):
-                for profile in page.get('RoutingProfileSummaryList', []):
+            # The three listings are independent, so fetch them concurrently
+            logger.info("Fetching existing routing profiles, security profiles and hierarchy groups...")
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                routing_future = executor.submit(self._list_all, 'list_routing_profiles', 'RoutingProfileSummaryList')
+                security_future = executor.submit(self._list_all, 'list_security_profiles', 'SecurityProfileSummaryList')
+                hierarchy_future = executor.submit(self._list_all, 'list_user_hierarchy_groups', 'UserHierarchyGroupSummaryList')
+                
+                for profile in routing_future.result():
                     resources['routing_profiles'][profile['Name']] = profile['Id']
-            
-            # Get security profiles
-            logger.info("Fetching existing security profiles...")
-            security_paginator = self.connect_client.get_paginator('list_security_profiles')
-            for page in security_paginator.paginate(InstanceId=self.instance_id):
-                for profile in page.get('SecurityProfileSummaryList', []):
+                
+                for profile in security_future.result():
                     # Handle different possible field names for security profile name
                     profile_name = profile.get('SecurityProfileName') or profile.get('Name')
                     if profile_name:
                         resources['security_profiles'][profile_name] = profile['Id']
                     else:
                         logger.warning(f"Security profile missing name field in target instance: {profile}")
-            
-            # Get hierarchy groups
-            logger.info("Fetching existing hierarchy groups...")
-            hierarchy_paginator = self.connect_client.get_paginator('list_user_hierarchy_groups')
-            for page in hierarchy_paginator.paginate(InstanceId=self.instance_id):
-                for group in page.get('UserHierarchyGroupSummaryList', []):
+                
+                for group in hierarchy_future.result():
                     resources['hierarchy_groups'][group['Name']] = group['Id']
             
             logger.info(f"Found {len(resources['routing_profiles'])} routing profiles")
             logger.info(f"Found {len(resources['security_profiles'])} security profiles")
             logger.info(f"Found {len(resources['hierarchy_groups'])} hierarchy groups")
             
+            # Names are only needed for diagnostics; build the list once rather than on every failure
+            self._security_profile_names = sorted(resources['security_profiles'])
+            self._security_profile_names_logged = False
+            
             return resources
             
         except ClientError as e:
             logger.error(f"Error fetching existing resources: {e}")
             raise
     
-    def create_missing_routing_profile(self, routing_profile: Dict) -> str:
+    def create_missing_routing_profile(self, routing_profile: Dict, existing_resources: Dict) -> Optional[str]:
         """
         Create a routing profile if it doesn't exist
         
+        The new profile is recorded in existing_resources so later users map to it
+        without another create attempt.
+        
         Args:
             routing_profile: Routing profile configuration
+            existing_resources: Existing resources in target instance (updated in place)
             
         Returns:
             Routing profile ID
         """
-        try:
-            # Prepare routing profile creation parameters
-            create_params = {
-                'InstanceId': self.instance_id,
-                'Name': routing_profile['Name'],
-                'Description': routing_profile.get('Description', ''),
-                'DefaultOutboundQueueId': routing_profile['DefaultOutboundQueueId'],
-                'MediaConcurrencies': routing_profile['MediaConcurrencies']
-            }
-            
-            # Add optional parameters if they exist
-            if routing_profile.get('QueueConfigs'):
-                create_params['QueueConfigs'] = routing_profile['QueueConfigs']
-            
-            # Add tags if they exist
-            if routing_profile.get('Tags'):
-                create_params['Tags'] = routing_profile['Tags']
-            
-            response = self.connect_client.create_routing_profile(**create_params)
-            
-            new_id = response['RoutingProfileId']
-            logger.info(f"Created routing profile: {routing_profile['Name']} -> {new_id}")
-            
-            return new_id
-            
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'DuplicateResourceException':
-                logger.warning(f"Routing profile already exists: {routing_profile['Name']}")
-                # Try to find the existing profile
-                return self.find_routing_profile_by_name(routing_profile['Name'])
-            else:
-                logger.error(f"Error creating routing profile {routing_profile['Name']}: {e}")
-                raise
+        name = routing_profile['Name']
+        routing_profiles = existing_resources['routing_profiles']
+        
+        # Fast path without the lock once the profile has been created (or has failed)
+        if name in routing_profiles:
+            return routing_profiles[name]
+        if name in self._failed_routing_profiles:
+            raise RuntimeError(f"Routing profile creation already failed this run: {self._failed_routing_profiles[name]}")
+        
+        # Users are created concurrently; serialize creation so two users sharing a
+        # missing profile don't both try to create it
+        with self._routing_profile_lock:
+            if name in routing_profiles:
+                return routing_profiles[name]
+            if name in self._failed_routing_profiles:
+                raise RuntimeError(f"Routing profile creation already failed this run: {self._failed_routing_profiles[name]}")
+            
+            try:
+                # Prepare routing profile creation parameters
+                create_params = {
+                    'InstanceId': self.instance_id,
+                    'Name': name,
+                    'Description': routing_profile.get('Description', ''),
+                    'DefaultOutboundQueueId': routing_profile['DefaultOutboundQueueId'],
+                    'MediaConcurrencies': routing_profile['MediaConcurrencies']
+                }
+                
+                # Add optional parameters if they exist
+                if routing_profile.get('QueueConfigs'):
+                    create_params['QueueConfigs'] = routing_profile['QueueConfigs']
+                
+                # Add tags if they exist
+                if routing_profile.get('Tags'):
+                    create_params['Tags'] = routing_profile['Tags']
+                
+                response = self.rate_limiter.call(self.connect_client.create_routing_profile, **create_params)
+                
+                new_id = response['RoutingProfileId']
+                routing_profiles[name] = new_id
+                logger.info("Created routing profile: %s -> %s", name, new_id)
+                
+                return new_id
+                
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'DuplicateResourceException':
+                    # CreateRoutingProfile has no ClientToken, so a retried request whose first
+                    # attempt succeeded (or a profile created outside this run) lands here.
+                    # Refresh the name map once to pick up the existing profile's ID.
+                    logger.warning("Routing profile already exists but was not in the fetched resources: %s", name)
+                    self._refresh_routing_profiles(routing_profiles)
+                    return routing_profiles.get(name)
+                else:
+                    # Remember the failure so other users sharing this profile don't retry it
+                    self._failed_routing_profiles[name] = str(e)
+                    logger.error("Error creating routing profile %s: %s", name, e)
+                    raise
     
-    def find_routing_profile_by_name(self, name: str) -> Optional[str]:
-        """Find routing profile ID by name"""
-        try:
-            paginator = self.connect_client.get_paginator('list_routing_profiles')
-            for page in paginator.paginate(InstanceId=self.instance_id):
-                for profile in page.get('RoutingProfileSummaryList', []):
-                    if profile['Name'] == name:
-                        return profile['Id']
-            return None
-        except Exception as e:
-            logger.error(f"Error finding routing profile by name {name}: {e}")
-            return None
+    def _refresh_routing_profiles(self, routing_profiles: Dict[str, str]):
+        """
+        Re-list routing profiles into an existing name->ID map
+        
+        Args:
+            routing_profiles: Routing profile name->ID map to update in place
+        """
+        for profile in self._list_all('list_routing_profiles', 'RoutingProfileSummaryList'):
+            routing_profiles[profile['Name']] = profile['Id']
+    
+    def _log_available_security_profiles(self):
+        """Log the target's security profile names once per run, the first time a lookup misses"""
+        if not self._security_profile_names_logged:
+            self._security_profile_names_logged = True
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Available security profiles in target instance: %s", ', '.join(self._security_profile_names))
     
     def map_resource_ids(self, user_data: Dict, existing_resources: Dict) -> Tuple[str, List[str], Optional[str]]:
         """
@@ -217,50 +481,50 @@ class ConnectUserImporter:
             Tuple of (routing_profile_id, security_profile_ids, hierarchy_group_id)
         """
         routing_profile_id = None
-        security_profile_ids = []
         hierarchy_group_id = None
         
+        # Bind the per-user sections and lookup maps once; this runs for every user
+        routing_profile = user_data.get('RoutingProfile')
+        hierarchy_group = user_data.get('HierarchyGroup')
+        routing_profile_map = existing_resources['routing_profiles']
+        hierarchy_group_map = existing_resources['hierarchy_groups']
+        
         # Map routing profile
-        if user_data.get('RoutingProfile'):
-            routing_profile_name = user_data['RoutingProfile']['Name']
-            routing_profile_id = existing_resources['routing_profiles'].get(routing_profile_name)
+        if routing_profile:
+            routing_profile_name = routing_profile['Name']
+            routing_profile_id = routing_profile_map.get(routing_profile_name)
             
             if not routing_profile_id:
-                logger.warning(f"Routing profile not found: {routing_profile_name}")
+                logger.warning("Routing profile not found: %s", routing_profile_name)
                 # Optionally create the routing profile
                 try:
-                    routing_profile_id = self.create_missing_routing_profile(user_data['RoutingProfile'])
+                    routing_profile_id = self.create_missing_routing_profile(routing_profile, existing_resources)
                 except Exception as e:
-                    logger.error(f"Failed to create routing profile {routing_profile_name}: {e}")
-        
-        # Map security profiles
-        for security_profile in user_data.get('SecurityProfiles', []):
-            # Handle different possible field names for security profile name
-            security_profile_name = None
-            if 'SecurityProfileName' in security_profile:
-                security_profile_name = security_profile['SecurityProfileName']
-            elif 'Name' in security_profile:
-                security_profile_name = security_profile['Name']
-            else:
-                logger.error(f"Security profile missing name field. Available fields: {list(security_profile.keys())}")
-                continue
+                    logger.error("Failed to create routing profile %s: %s", routing_profile_name, e)
+        
+        # Map security profiles - normally already resolved by analyze_security_profiles
+        security_profile_ids = self._resolved_security_profile_ids.get(user_data['User']['Username'])
+        
+        if security_profile_ids is None:
+            # Unique names, so each is looked up once
+            security_profile_names = get_security_profile_names(user_data)
             
-            security_profile_id = existing_resources['security_profiles'].get(security_profile_name)
+            security_profile_map = existing_resources['security_profiles']
+            security_profile_ids = [security_profile_map[name] for name in security_profile_names if name in security_profile_map]
             
-            if security_profile_id:
-                security_profile_ids.append(security_profile_id)
-                logger.debug(f"Mapped security profile: {security_profile_name} -> {security_profile_id}")
-            else:
-                logger.warning(f"Security profile not found in target instance: '{security_profile_name}'")
-                logger.info(f"Available security profiles in target: {list(existing_resources['security_profiles'].keys())}")
+            missing_security_profiles = set(security_profile_names) - security_profile_map.keys()
+            if missing_security_profiles:
+                for security_profile_name in missing_security_profiles:
+                    logger.warning("Security profile not found in target instance: '%s'", security_profile_name)
+                self._log_available_security_profiles()
         
         # Map hierarchy group
-        if user_data.get('HierarchyGroup'):
-            hierarchy_group_name = user_data['HierarchyGroup']['Name']
-            hierarchy_group_id = existing_resources['hierarchy_groups'].get(hierarchy_group_name)
+        if hierarchy_group:
+            hierarchy_group_name = hierarchy_group['Name']
+            hierarchy_group_id = hierarchy_group_map.get(hierarchy_group_name)
             
             if not hierarchy_group_id:
-                logger.warning(f"Hierarchy group not found: {hierarchy_group_name}")
+                logger.warning("Hierarchy group not found: %s", hierarchy_group_name)
         
         return routing_profile_id, security_profile_ids, hierarchy_group_id
     
@@ -273,7 +537,21 @@ class ConnectUserImporter:
             existing_resources: Existing resources for mapping
             
         Returns:
-            True if successful, False otherwise
+            True if the user was created or already exists, False otherwise
+        """
+        return self._create_user(user_data, existing_resources) != 'failed'
+    
+    def _create_user(self, user_data: Dict, existing_resources: Dict) -> str:
+        """
+        Create a single user, reporting whether it was new
+        
+        Args:
+            user_data: Complete user data from export
+            existing_resources: Existing resources for mapping
+            
+        Returns:
+            'success' if the user was created, 'existing' if the username was already
+            taken in the target instance, 'failed' otherwise
         """
         user_info = user_data['User']
         username = user_info['Username']
@@ -285,94 +563,234 @@ class ConnectUserImporter:
             )
             
             if not routing_profile_id:
-                logger.error(f"Cannot create user {username}: No valid routing profile")
-                return False
+                logger.error("Cannot create user %s: No valid routing profile", username)
+                return 'failed'
             
             if not security_profile_ids:
                 # Log detailed information about missing security profiles
-                user_security_profiles = [
-                    sp.get('SecurityProfileName') or sp.get('Name', 'Unknown') 
-                    for sp in user_data.get('SecurityProfiles', [])
-                ]
-                logger.error(f"Cannot create user {username}: No valid security profiles found")
-                logger.error(f"User {username} requires security profiles: {user_security_profiles}")
-                logger.error(f"Available security profiles in target instance: {list(existing_resources['security_profiles'].keys())}")
-                return False
+                logger.error("Cannot create user %s: No valid security profiles found", username)
+                logger.error("User %s requires security profiles: %s", username, get_security_profile_names(user_data))
+                self._log_available_security_profiles()
+                return 'failed'
             
             # Prepare user creation parameters
             create_params = {
+                **self._user_template,
                 'Username': username,
-                'InstanceId': self.instance_id,
                 'RoutingProfileId': routing_profile_id,
                 'SecurityProfileIds': security_profile_ids
             }
             
             # Add optional parameters
-            if user_info.get('IdentityInfo'):
-                create_params['IdentityInfo'] = user_info['IdentityInfo']
-            
-            if user_info.get('PhoneConfig'):
-                create_params['PhoneConfig'] = user_info['PhoneConfig']
+            create_params.update((field, user_info[field]) for field in OPTIONAL_USER_FIELDS if user_info.get(field))
             
             if hierarchy_group_id:
                 create_params['HierarchyGroupId'] = hierarchy_group_id
             
-            if user_info.get('DirectoryUserId'):
-                create_params['DirectoryUserId'] = user_info['DirectoryUserId']
-            
-            if user_info.get('Tags'):
-                create_params['Tags'] = user_info['Tags']
-            
-            # Create the user
-            response = self.connect_client.create_user(**create_params)
+            # Create the user. The CreateUser token is only taken here, so users that fail
+            # mapping above never spend quota
+            if self.create_user_bucket is not None:
+                self.create_user_bucket.acquire()
+            response = self.rate_limiter.call(self.connect_client.create_user, **create_params)
             
             new_user_id = response['UserId']
-            logger.info(f"Created user: {username} -> {new_user_id}")
+            logger.debug("Created user: %s -> %s", username, new_user_id)
             
-            return True
+            return 'success'
             
         except ClientError as e:
             if e.response['Error']['Code'] == 'DuplicateResourceException':
-                logger.warning(f"User already exists: {username}")
-                return True  # Consider existing user as success
+                # CreateUser has no ClientToken; usernames are unique per instance, so a
+                # duplicate means an earlier attempt (retry or previous run) created it
+                logger.warning("User already exists: %s", username)
+                return 'existing'
             else:
-                logger.error(f"Error creating user {username}: {e}")
-                return False
+                logger.error("Error creating user %s: %s", username, e)
+                return 'failed'
         except Exception as e:
-            logger.error(f"Unexpected error creating user {username}: {e}")
-            return False
+            logger.error("Unexpected error creating user %s: %s", username, e)
+            return 'failed'
     
-    def analyze_security_profiles(self, users_data: List[Dict], existing_resources: Dict) -> Dict:
+    def _create_one(self, user_data: Dict, existing_resources: Dict) -> Tuple[str, str]:
+        """
+        Create a single user for the import loop
+        
+        Args:
+            user_data: User data from export
+            existing_resources: Existing resources in target instance
+            
+        Returns:
+            Tuple of (result key - 'success', 'existing' or 'failed', username)
+        """
+        username = user_data['User']['Username']
+        
+        try:
+            status = self._create_user(user_data, existing_resources)
+        except Exception as e:
+            logger.error("Error processing user %s: %s", username, e)
+            status = 'failed'
+        
+        return status, username
+    
+    def _create_rolling(self, executor: ThreadPoolExecutor, users_data: Iterable[Dict],
+                        existing_resources: Dict) -> Iterator[Tuple[str, str]]:
+        """
+        Create users through a rolling window of in-flight requests
+        
+        Keeps up to 2 * max_workers creates submitted and submits the next user as soon as
+        any one finishes, so a slow call never holds up the others. Unlike executor.map,
+        the export stream is only read as fast as users are created.
+        
+        Args:
+            executor: Worker pool to run create calls on
+            users_data: User data from export
+            existing_resources: Existing resources in target instance
+            
+        Yields:
+            Tuple of (result key, username) per user, in completion order
+        """
+        max_in_flight = self.max_workers * 2
+        users_iter = iter(users_data)
+        pending = set()
+        
+        while True:
+            for user_data in islice(users_iter, max_in_flight - len(pending)):
+                pending.add(executor.submit(self._create_one, user_data, existing_resources))
+            
+            if not pending:
+                return
+            
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    
+    def _validate_users(self, users_data: Iterable[Dict], existing_resources: Dict) -> Iterator[Tuple[str, str]]:
+        """
+        Validate users' resource mappings without creating anything (dry run)
+        
+        Works on resource names with set operations rather than calling map_resource_ids
+        per user, so missing routing profiles are reported instead of created, and a single
+        consolidated report of missing resources is logged at the end.
+        
+        Args:
+            users_data: User data from export
+            existing_resources: Existing resources in target instance
+            
+        Yields:
+            Tuple of (result key - 'success', 'skipped' or 'failed', username) per user
+        """
+        available_security_profiles = existing_resources['security_profiles'].keys()
+        resolved_security_profile_ids = self._resolved_security_profile_ids
+        required_routing_profiles = set()
+        required_hierarchy_groups = set()
+        
+        for user_data in users_data:
+            try:
+                username = user_data['User']['Username']
+            except (KeyError, TypeError) as e:
+                logger.error("Error processing user record: %s", e)
+                yield 'failed', 'Unknown'
+                continue
+            
+            routing_profile = user_data.get('RoutingProfile')
+            if routing_profile:
+                required_routing_profiles.add(routing_profile['Name'])
+            if user_data.get('HierarchyGroup'):
+                required_hierarchy_groups.add(user_data['HierarchyGroup']['Name'])
+            
+            # Reuse the IDs resolved during the analysis pass; only re-walk the profiles
+            # for users that weren't part of it
+            security_profile_ids = resolved_security_profile_ids.get(username)
+            if security_profile_ids is None:
+                has_security_profile = not available_security_profiles.isdisjoint(get_security_profile_names(user_data))
+            else:
+                has_security_profile = bool(security_profile_ids)
+            
+            # A user is importable with a routing profile (existing or creatable) and at
+            # least one security profile that exists in the target
+            if routing_profile and has_security_profile:
+                logger.info("[DRY RUN] Would create user: %s", username)
+                yield 'success', username
+            else:
+                logger.warning("[DRY RUN] Would skip user: %s (missing resources)", username)
+                yield 'skipped', username
+        
+        missing_routing_profiles = required_routing_profiles - existing_resources['routing_profiles'].keys()
+        missing_hierarchy_groups = required_hierarchy_groups - existing_resources['hierarchy_groups'].keys()
+        
+        if missing_routing_profiles:
+            logger.warning(f"[DRY RUN] Routing profiles missing in target (created during import): {sorted(missing_routing_profiles)}")
+        if missing_hierarchy_groups:
+            logger.warning(f"[DRY RUN] Hierarchy groups missing in target (users imported without one): {sorted(missing_hierarchy_groups)}")
+    
+    def analyze_security_profiles(self, users_data: Iterable[Dict], existing_resources: Dict) -> Dict:
         """
         Analyze security profile requirements and availability
         
         Args:
-            users_data: List of user data from export
+            users_data: User data from export (any iterable, consumed once)
             existing_resources: Existing resources in target instance
             
         Returns:
             Analysis results with missing profiles and affected users
         """
-        required_profiles = set()
-        profile_usage = {}
+        return self._summarize_security_profiles(self._scan_security_profiles(users_data), existing_resources)
+    
+    def _scan_security_profiles(self, users_data: Iterable[Dict]) -> Dict:
+        """
+        Collect the security profiles each user needs; needs nothing from the target instance
+        
+        Args:
+            users_data: User data from export (any iterable, consumed once)
+            
+        Returns:
+            Scan results: profile_usage (name -> usernames), user_profile_names
+            (username -> names) and total_users
+        """
+        profile_usage = defaultdict(list)
+        user_profile_names = {}
+        total_users = 0
         
-        # Collect all required security profiles
         for user_data in users_data:
+            total_users += 1
             username = user_data['User']['Username']
-            user_profiles = []
-            
-            for security_profile in user_data.get('SecurityProfiles', []):
-                # Handle different possible field names
-                profile_name = security_profile.get('SecurityProfileName') or security_profile.get('Name')
-                if profile_name:
-                    required_profiles.add(profile_name)
-                    user_profiles.append(profile_name)
-                    
-                    if profile_name not in profile_usage:
-                        profile_usage[profile_name] = []
-                    profile_usage[profile_name].append(username)
-        
-        available_profiles = set(existing_resources['security_profiles'].keys())
+            security_profile_names = get_security_profile_names(user_data)
+            user_profile_names[username] = security_profile_names
+            
+            for profile_name in security_profile_names:
+                profile_usage[profile_name].append(username)
+        
+        return {
+            'profile_usage': profile_usage,
+            'user_profile_names': user_profile_names,
+            'total_users': total_users
+        }
+    
+    def _summarize_security_profiles(self, scan: Dict, existing_resources: Dict) -> Dict:
+        """
+        Check scanned security profile requirements against the target instance
+        
+        Also resolves each user's security profile IDs, so map_resource_ids doesn't
+        walk the export's profiles again during the import pass.
+        
+        Args:
+            scan: Results of _scan_security_profiles
+            existing_resources: Existing resources in target instance
+            
+        Returns:
+            Analysis results with missing profiles and affected users
+        """
+        profile_usage = scan['profile_usage']
+        total_users = scan['total_users']
+        required_profiles = set(profile_usage)
+        security_profile_map = existing_resources['security_profiles']
+        
+        self._resolved_security_profile_ids = {
+            username: [security_profile_map[name] for name in names if name in security_profile_map]
+            for username, names in scan['user_profile_names'].items()
+        }
+        
+        available_profiles = set(security_profile_map.keys())
         missing_profiles = required_profiles - available_profiles
         
         # Analyze impact
@@ -385,55 +803,99 @@ class ConnectUserImporter:
             'available_profiles': available_profiles,
             'missing_profiles': missing_profiles,
             'affected_users': affected_users,
-            'profile_usage': profile_usage
+            'profile_usage': profile_usage,
+            'total_users': total_users
         }
         
         # Log analysis results
-        logger.info(f"Security Profile Analysis:")
-        logger.info(f"  Required profiles: {len(required_profiles)}")
-        logger.info(f"  Available in target: {len(available_profiles)}")
-        logger.info(f"  Missing profiles: {len(missing_profiles)}")
-        logger.info(f"  Users affected by missing profiles: {len(affected_users)}")
+        logger.info("Security Profile Analysis:")
+        logger.info("  Required profiles: %d", len(required_profiles))
+        logger.info("  Available in target: %d", len(available_profiles))
+        logger.info("  Missing profiles: %d", len(missing_profiles))
+        logger.info("  Users affected by missing profiles: %d", len(affected_users))
         
         if missing_profiles:
-            logger.warning(f"Missing security profiles: {sorted(missing_profiles)}")
+            logger.warning("Missing security profiles: %s", sorted(missing_profiles))
             for missing_profile in sorted(missing_profiles):
                 users_with_profile = profile_usage.get(missing_profile, [])
-                logger.warning(f"  '{missing_profile}' needed by {len(users_with_profile)} users: {users_with_profile[:5]}{'...' if len(users_with_profile) > 5 else ''}")
+                logger.warning("  '%s' needed by %d users: %s%s", missing_profile, len(users_with_profile),
+                               users_with_profile[:5], '...' if len(users_with_profile) > 5 else '')
         
         return analysis
     
-    def import_users(self, export_file: str, batch_size: int = 50, dry_run: bool = False) -> Dict:
+    def import_users(self, export_file: str, batch_size: Optional[int] = None, dry_run: bool = False,
+                     reuse_dry_run: bool = False) -> Dict:
         """
         Import users from export file
         
+        The target's resources are always listed fresh, so profiles created after a
+        dry run are picked up by the import that follows it.
+        
         Args:
             export_file: Path to the export file
-            batch_size: Number of users to process in each batch
+            batch_size: Number of users between progress log lines (default: 1% of the export)
             dry_run: If True, only validate without creating users
+            reuse_dry_run: Reuse the export's security profile scan from the directly
+                           preceding dry run of the same, unchanged export (default: False)
             
         Returns:
-            Import results summary
+            Import results summary: success, failed and skipped counts, existing (users
+            already in the target, which aren't counted as successes) and failed_users
         """
         # Log run start
         log_run_separator("USER IMPORT", "START")
         
         logger.info(f"Starting user import process (dry_run={dry_run})...")
         
-        # Load export data
-        export_data = self.load_export_data(export_file)
-        users_to_import = export_data.get('Users', [])
-        
-        if not users_to_import:
+        if ijson is not None:
+            # The export is streamed twice (analysis pass, then import pass) so the
+            # full user list is never held in memory
+            header = self.read_export_header(export_file)
+            iter_users = lambda: self.iter_export_users(export_file)
+        else:
+            # Without ijson the whole export has to be parsed anyway, so parse it once
+            # and reuse the user list for both passes
+            export_data = self.load_export_data(export_file)
+            header = export_data
+            users = export_data.get('Users', [])
+            iter_users = lambda: iter(users)
+        
+        logger.info(f"Export from instance {header.get('InstanceId')} at {header.get('ExportTimestamp')}: "
+                    f"{header.get('TotalUsers', 0)} users listed")
+        
+        # The header's count avoids fetching anything for an empty export; exports whose
+        # listed users all failed to export are caught by the scan below
+        if header.get('TotalUsers') == 0:
             logger.warning("No users found in export file")
             log_run_separator("USER IMPORT", "END")
-            return {'success': 0, 'failed': 0, 'skipped': 0}
-        
-        # Get existing resources for mapping
-        existing_resources = self.get_existing_resources()
+            return {'success': 0, 'failed': 0, 'skipped': 0, 'existing': 0}
+        
+        export_key = (os.path.abspath(export_file), os.path.getmtime(export_file))
+        dry_run_cache, self._dry_run_cache = self._dry_run_cache, None
+        
+        if reuse_dry_run and not dry_run and dry_run_cache and dry_run_cache[0] == export_key:
+            # The scan only depends on the export; the target may have changed since the dry run
+            logger.info("Reusing the export's security profile scan from the preceding dry run")
+            security_scan = dry_run_cache[1]
+            existing_resources = self.get_existing_resources()
+        else:
+            # Fetching the target's resources is network-bound and parsing the export is
+            # CPU-bound, so overlap them: fetch on a background thread while scanning here
+            with ThreadPoolExecutor(max_workers=1) as prefetch:
+                resources_future = prefetch.submit(self.get_existing_resources)
+                security_scan = self._scan_security_profiles(iter_users())
+                existing_resources = resources_future.result()
+        
+        if dry_run:
+            self._dry_run_cache = (export_key, security_scan)
+        
+        if not security_scan['total_users']:
+            logger.warning("No users found in export file")
+            log_run_separator("USER IMPORT", "END")
+            return {'success': 0, 'failed': 0, 'skipped': 0, 'existing': 0}
         
         # Analyze security profile requirements
-        security_analysis = self.analyze_security_profiles(users_to_import, existing_resources)
+        security_analysis = self._summarize_security_profiles(security_scan, existing_resources)
         
         if security_analysis['missing_profiles'] and not dry_run:
             logger.error("Cannot proceed with import due to missing security profiles!")
@@ -443,6 +905,7 @@ class ConnectUserImporter:
                 'success': 0, 
                 'failed': len(security_analysis['affected_users']), 
                 'skipped': 0,
+                'existing': 0,
                 'failed_users': list(security_analysis['affected_users']),
                 'missing_security_profiles': list(security_analysis['missing_profiles'])
             }
@@ -452,58 +915,40 @@ class ConnectUserImporter:
             'success': 0,
             'failed': 0,
             'skipped': 0,
+            'existing': 0,
             'failed_users': []
         }
         
-        # Process users in batches
-        total_users = len(users_to_import)
-        
-        for i in range(0, total_users, batch_size):
-            batch = users_to_import[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            total_batches = (total_users + batch_size - 1) // batch_size
-            
-            logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} users)")
+        # Process users
+        total_users = security_analysis['total_users']
+        progress_interval = batch_size or max(1, total_users // 100)
+        users_iter = iter_users()
+        
+        # create_user is network-bound, so creates run concurrently on worker threads
+        # sharing the (thread-safe) connect client; a new create starts as soon as any
+        # in-flight one finishes rather than waiting for a whole batch
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            if dry_run:
+                outcomes = self._validate_users(users_iter, existing_resources)
+            else:
+                outcomes = self._create_rolling(executor, users_iter, existing_resources)
             
-            for user_data in batch:
-                username = user_data['User']['Username']
-                
-                try:
-                    if dry_run:
-                        # Validate mapping without creating
-                        routing_profile_id, security_profile_ids, hierarchy_group_id = self.map_resource_ids(
-                            user_data, existing_resources
-                        )
-                        
-                        if routing_profile_id and security_profile_ids:
-                            logger.info(f"[DRY RUN] Would create user: {username}")
-                            results['success'] += 1
-                        else:
-                            logger.warning(f"[DRY RUN] Would skip user: {username} (missing resources)")
-                            results['skipped'] += 1
-                    else:
-                        # Actually create the user
-                        if self.create_user(user_data, existing_resources):
-                            results['success'] += 1
-                        else:
-                            results['failed'] += 1
-                            results['failed_users'].append(username)
-                
-                except Exception as e:
-                    logger.error(f"Error processing user {username}: {e}")
-                    results['failed'] += 1
+            # Counters are only touched here, on the main thread, so no locking is needed
+            for processed, (status, username) in enumerate(outcomes, 1):
+                results[status] += 1
+                if status == 'failed':
                     results['failed_users'].append(username)
-            
-            # Rate limiting between batches
-            if not dry_run and batch_num < total_batches:
-                logger.info("Waiting between batches...")
-                time.sleep(2)
+                
+                if processed % progress_interval == 0 or processed == total_users:
+                    logger.info("Progress: %d/%d (%.1f%%)", processed, total_users, 100.0 * processed / total_users)
         
         # Log final results
         logger.info("Import process completed!")
         logger.info(f"Successful: {results['success']}")
         logger.info(f"Failed: {results['failed']}")
         logger.info(f"Skipped: {results['skipped']}")
+        if results['existing']:
+            logger.info(f"Already existed: {results['existing']}")
         
         if results['failed_users']:
             logger.info(f"Failed users: {', '.join(results['failed_users'][:10])}")
@@ -524,25 +969,38 @@ def main():
     parser.add_argument('--export-file', required=True, help='Path to the export file')
     parser.add_argument('--region', default='us-east-1', help='AWS region')
     parser.add_argument('--profile', help='AWS profile name')
-    parser.add_argument('--batch-size', type=int, default=50, help='Batch size for processing')
+    parser.add_argument('--batch-size', type=int, help='Users between progress log lines (default: 1%% of the export)')
+    parser.add_argument('--workers', type=int, default=MAX_CONCURRENT_CREATES, help='Number of users to create concurrently')
+    parser.add_argument('--create-user-tps', type=float, default=DEFAULT_CREATE_USER_TPS,
+                        help='Sustained create_user calls per second (0 disables pacing)')
     parser.add_argument('--dry-run', action='store_true', help='Validate without creating users')
     
     args = parser.parse_args()
     
+    # The log format doesn't use thread/process fields, so skip collecting them per record.
+    # Only done here: these are process-wide, and importing this module shouldn't change them.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
     try:
         importer = ConnectUserImporter(
             instance_id=args.instance_id,
             region=args.region,
-            profile=args.profile
+            profile=args.profile,
+            max_workers=args.workers,
+            create_user_tps=args.create_user_tps
         )
         
-        results = importer.import_users(
-            export_file=args.export_file,
-            batch_size=args.batch_size,
-            dry_run=args.dry_run
-        )
+        with queued_logging():
+            results = importer.import_users(
+                export_file=args.export_file,
+                batch_size=args.batch_size,
+                dry_run=args.dry_run
+            )
         
-        print(f"Import completed - Success: {results['success']}, Failed: {results['failed']}, Skipped: {results['skipped']}")
+        print(f"Import completed - Success: {results['success']}, Failed: {results['failed']}, Skipped: {results['skipped']}, "
+              f"Already existed: {results['existing']}")
         
     except Exception as e:
         logger.error(f"Import failed: {e}")
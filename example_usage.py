@@ -6,21 +6,76 @@ Demonstrates how to use the export, import, and helper utilities programmaticall
 
 import json
 import logging
-from connect_user_export import ConnectUserExporter
-from connect_user_import import ConnectUserImporter
-from security_profile_helper import SecurityProfileHelper
-from connect_queue_export import ConnectQueueExporter
-from connect_queue_import import ConnectQueueImporter
-from connect_phone_number_mapper import ConnectPhoneNumberMapper
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+# The migration modules (and boto3) are imported inside each example, so listing the
+# examples doesn't pay for loading them. The first module an example imports also sets
+# up logging (console plus that script's log file).
+
+try:
+    import orjson
+except ImportError:  # Optional - faster JSON parsing/encoding, falls back to json
+    orjson = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# JSON files above this size are parsed from a memory map (orjson only)
+MMAP_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+def load_json(path):
+    """Load a JSON file, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size <= MMAP_THRESHOLD_BYTES:
+                return orjson.loads(f.read())
+            # Parse large files straight from the page cache instead of copying them
+            # into a bytes object first
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_json(data, path):
+    """Write data as indented JSON, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str))
+        return
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+
+def create_session(aws_profile=None):
+    """
+    Create one boto3 session for an example to share between helpers, so credentials
+    and service models are loaded once rather than per helper
+    """
+    import boto3
+    
+    return boto3.Session(profile_name=aws_profile) if aws_profile else boto3.Session()
+
+def create_client_config():
+    """
+    Client settings for the helpers that don't tune their own; the user exporter and
+    importer size their connection pools from their worker counts
+    """
+    from botocore.config import Config
+    
+    return Config(
+        max_pool_connections=64,
+        retries={'mode': 'adaptive', 'max_attempts': 10},
+        tcp_keepalive=True
+    )
+
 def migrate_users_example():
     """
     Example of complete user migration workflow
     """
+    from connect_user_export import ConnectUserExporter
+    from connect_user_import import ConnectUserImporter
+    
     # Configuration
     source_instance_id = "your-source-instance-id"
     target_instance_id = "your-target-instance-id"
@@ -28,12 +83,14 @@ def migrate_users_example():
     aws_profile = None  # Use default credentials
     
     try:
+        session = create_session(aws_profile)
+        
         # Step 1: Export users from source instance
         logger.info("Starting user export...")
         exporter = ConnectUserExporter(
             instance_id=source_instance_id,
             region=region,
-            profile=aws_profile
+            session=session
         )
         
         export_file = exporter.export_users("users_migration.json")
@@ -44,14 +101,13 @@ def migrate_users_example():
         importer = ConnectUserImporter(
             instance_id=target_instance_id,
             region=region,
-            profile=aws_profile
+            session=session
         )
         
         # First, run a dry run to validate
         logger.info("Running dry run validation...")
         dry_run_results = importer.import_users(
             export_file=export_file,
-            batch_size=25,
             dry_run=True
         )
         
@@ -60,10 +116,12 @@ def migrate_users_example():
         # If dry run looks good, proceed with actual import
         if dry_run_results['success'] > 0:
             logger.info("Proceeding with actual import...")
+            # Same importer and file, so the export's security profile scan is reused;
+            # the target's resources are still listed again
             import_results = importer.import_users(
                 export_file=export_file,
-                batch_size=25,
-                dry_run=False
+                dry_run=False,
+                reuse_dry_run=True
             )
             
             logger.info(f"Import completed: {import_results}")
@@ -78,6 +136,8 @@ def export_only_example():
     """
     Example of exporting users only
     """
+    from connect_user_export import ConnectUserExporter
+    
     instance_id = "your-instance-id"
     
     try:
@@ -95,16 +155,18 @@ def import_only_example():
     """
     Example of importing users only
     """
+    from connect_user_import import ConnectUserImporter
+    
     instance_id = "your-target-instance-id"
     export_file = "users_export.json"
     
     try:
-        importer = ConnectUserImporter(instance_id=instance_id)
+        # Import speed is set by create_user_tps; raise it to match the instance's
+        # CreateUser quota if that has been increased
+        importer = ConnectUserImporter(instance_id=instance_id, create_user_tps=2.0)
         
-        # Import with larger batch size for faster processing
         results = importer.import_users(
             export_file=export_file,
-            batch_size=100,
             dry_run=False
         )
         
@@ -117,32 +179,36 @@ def validate_export_file_example():
     """
     Example of validating an export file before import
     """
+    from connect_user_import import ConnectUserImporter
+    
     export_file = "users_export.json"
     target_instance_id = "your-target-instance-id"
     
     try:
         importer = ConnectUserImporter(instance_id=target_instance_id)
         
-        # Load and validate the export file
-        export_data = importer.load_export_data(export_file)
+        # Read the summary fields that precede the Users array without parsing it.
+        # Success/failure counts are written after the array, so they come from the
+        # dry run below instead.
+        export_header = importer.read_export_header(export_file)
         
         print(f"Export file validation:")
-        print(f"- Source instance: {export_data.get('InstanceId')}")
-        print(f"- Export timestamp: {export_data.get('ExportTimestamp')}")
-        print(f"- Total users: {export_data.get('TotalUsers')}")
-        print(f"- Successful exports: {export_data.get('SuccessfulExports')}")
-        print(f"- Failed exports: {export_data.get('FailedExports')}")
-        
-        # Analyze user data for tags and configurations
-        users = export_data.get('Users', [])
-        if users:
-            sample_user = users[0]
+        print(f"- Source instance: {export_header.get('InstanceId')}")
+        print(f"- Export timestamp: {export_header.get('ExportTimestamp')}")
+        print(f"- Total users: {export_header.get('TotalUsers')}")
+        
+        # Analyze the first user for tags and configurations (only that user is parsed)
+        sample_user = next(iter(importer.iter_export_users(export_file)), None)
+        if sample_user:
+            user_info = sample_user['User']
+            routing_profile = sample_user.get('RoutingProfile') or {}
+            
             print(f"\nSample user analysis:")
-            print(f"- Username: {sample_user['User'].get('Username')}")
-            print(f"- Has user tags: {'Yes' if sample_user['User'].get('Tags') else 'No'}")
-            print(f"- Has routing profile: {'Yes' if sample_user.get('RoutingProfile') else 'No'}")
-            print(f"- Has routing profile tags: {'Yes' if sample_user.get('RoutingProfile', {}).get('Tags') else 'No'}")
-            print(f"- Security profiles count: {len(sample_user.get('SecurityProfiles', []))}")
+            print(f"- Username: {user_info.get('Username')}")
+            print(f"- Has user tags: {'Yes' if user_info.get('Tags') else 'No'}")
+            print(f"- Has routing profile: {'Yes' if routing_profile else 'No'}")
+            print(f"- Has routing profile tags: {'Yes' if routing_profile.get('Tags') else 'No'}")
+            print(f"- Security profiles count: {len(sample_user.get('SecurityProfiles', ()))}")
         
         # Run dry run to check compatibility
         results = importer.import_users(
@@ -151,6 +217,7 @@ def validate_export_file_example():
         )
         
         print(f"\nCompatibility check results:")
+        print(f"- Users in export: {results['success'] + results['failed'] + results['skipped']}")
         print(f"- Would succeed: {results['success']}")
         print(f"- Would fail: {results['failed']}")
         print(f"- Would skip: {results['skipped']}")
@@ -165,16 +232,17 @@ def performance_optimization_example():
     """
     Example of using performance optimization features
     """
-    from performance_tuning import PerformanceTuner, get_recommended_batch_size
+    from performance_tuning import (PerformanceTuner, estimate_import_seconds, get_recommended_batch_size,
+                                    get_recommended_import_settings)
+    from connect_user_import import ConnectUserImporter
     
     export_file = "users_export.json"
     target_instance_id = "your-target-instance-id"
     
     try:
-        # Load export data to get user count
+        # Read the user count from the export header
         importer = ConnectUserImporter(instance_id=target_instance_id)
-        export_data = importer.load_export_data(export_file)
-        user_count = export_data.get('TotalUsers', 0)
+        user_count = importer.read_export_header(export_file).get('TotalUsers', 0)
         
         print(f"Optimizing for {user_count:,} users...")
         
@@ -182,7 +250,14 @@ def performance_optimization_example():
         recommendation = get_recommended_batch_size(user_count)
         print(f"Recommended batch size: {recommendation['batch_size']} - {recommendation['description']}")
         
-        # Run performance benchmark
+        # Get recommended settings for the account's CreateUser quota (2 TPS unless raised)
+        recommendation = get_recommended_import_settings(create_user_quota=2.0)
+        minutes = estimate_import_seconds(user_count, recommendation['create_user_tps']) / 60
+        print(f"Recommended settings: {recommendation['description']} (about {minutes:.0f} minutes)")
+        
+        # Run performance benchmark (dry runs over a sample, so nothing is created).
+        # tuner.benchmark_workers(export_file, create_users=True) measures real create
+        # rates, but creates users - only run it against a test instance.
         tuner = PerformanceTuner(target_instance_id)
         results, best_batch = tuner.benchmark_batch_sizes(export_file)
         
@@ -200,27 +275,30 @@ def tag_preservation_example():
     """
     Example demonstrating tag preservation during migration
     """
+    from connect_user_export import ConnectUserExporter
+    from connect_user_import import ConnectUserImporter
+    
     source_instance_id = "your-source-instance-id"
     target_instance_id = "your-target-instance-id"
     
     try:
+        session = create_session()
+        
         # Export with focus on tag preservation
-        exporter = ConnectUserExporter(instance_id=source_instance_id)
+        exporter = ConnectUserExporter(instance_id=source_instance_id, session=session)
         export_file = exporter.export_users("tagged_users_export.json")
         
-        # Analyze tags in export
-        export_data = exporter.load_export_data if hasattr(exporter, 'load_export_data') else None
-        if not export_data:
-            importer = ConnectUserImporter(instance_id=target_instance_id)
-            export_data = importer.load_export_data(export_file)
+        # Analyze tags in export, streaming one user at a time
+        importer = ConnectUserImporter(instance_id=target_instance_id, session=session)
         
         users_with_tags = 0
         routing_profiles_with_tags = 0
         
-        for user_data in export_data.get('Users', []):
+        for user_data in importer.iter_export_users(export_file):
             if user_data['User'].get('Tags'):
                 users_with_tags += 1
-            if user_data.get('RoutingProfile', {}).get('Tags'):
+            # The exporter writes None when a routing profile couldn't be described
+            if (user_data.get('RoutingProfile') or {}).get('Tags'):
                 routing_profiles_with_tags += 1
         
         print(f"Tag analysis:")
@@ -228,10 +306,8 @@ def tag_preservation_example():
         print(f"- Routing profiles with tags: {routing_profiles_with_tags}")
         
         # Import with tag preservation
-        importer = ConnectUserImporter(instance_id=target_instance_id)
         results = importer.import_users(
             export_file=export_file,
-            batch_size=25,  # Conservative for tag-heavy imports
             dry_run=True
         )
         
@@ -245,6 +321,10 @@ def cross_region_migration_example():
     """
     Example of complete cross-region migration workflow with security profile handling
     """
+    from connect_user_export import ConnectUserExporter
+    from connect_user_import import ConnectUserImporter
+    from security_profile_helper import SecurityProfileHelper
+    
     # Configuration
     source_instance_id = "your-source-instance-id"
     target_instance_id = "your-target-instance-id"
@@ -253,70 +333,75 @@ def cross_region_migration_example():
     aws_profile = None
     
     try:
+        # One session serves both regions; each client is bound to its own region
+        session = create_session(aws_profile)
+        
         # Step 1: Export users from source region
         logger.info("Step 1: Exporting users from source region...")
         exporter = ConnectUserExporter(
             instance_id=source_instance_id,
             region=source_region,
-            profile=aws_profile
+            session=session
         )
         
-        export_file = exporter.export_users("cross_region_users_export.json")
+        # zstd keeps the export small for copying between regions (requires zstandard;
+        # use a .json.gz name otherwise). The importer and helpers read it transparently.
+        export_file = exporter.export_users("cross_region_users_export.json.zst")
         logger.info(f"Export completed: {export_file}")
         
-        # Step 2: Analyze security profiles for target region
-        logger.info("Step 2: Analyzing security profiles...")
-        security_helper = SecurityProfileHelper(region=target_region, profile=aws_profile)
+        # Step 2: Compare security profiles and dry-run the import in parallel. Both only
+        # read the export file and call the target region, so neither waits on the other.
+        logger.info("Step 2: Analyzing security profiles and running import dry run...")
+        security_helper = SecurityProfileHelper(region=target_region, session=session, client_config=create_client_config())
+        importer = ConnectUserImporter(
+            instance_id=target_instance_id,
+            region=target_region,
+            session=session
+        )
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            comparison_future = executor.submit(security_helper.compare_profiles, export_file, target_instance_id)
+            dry_run_future = executor.submit(importer.import_users, export_file=export_file, dry_run=True)
+            comparison = comparison_future.result()
+            dry_run_results = dry_run_future.result()
         
-        # Compare security profiles between regions
-        comparison = security_helper.compare_security_profiles(export_file, target_instance_id)
+        missing_profiles = comparison['missing_profiles']  # set of profile names
         
         print(f"Security Profile Analysis:")
         print(f"- Required profiles: {len(comparison['required_profiles'])}")
-        print(f"- Missing profiles: {len(comparison['missing_profiles'])}")
+        print(f"- Missing profiles: {len(missing_profiles)}")
         print(f"- Available profiles: {len(comparison['existing_profiles'])}")
         
         # Step 3: Create missing security profiles if needed
-        if comparison['missing_profiles']:
+        if missing_profiles:
             logger.info("Step 3: Creating missing security profiles...")
-            commands = security_helper.generate_security_profile_commands(export_file, target_instance_id)
+            commands = security_helper.generate_security_profile_commands(
+                export_file, target_instance_id, comparison=comparison
+            )
             
             # Save commands to script file
             script_file = f"create_security_profiles_{target_instance_id}.sh"
             with open(script_file, 'w') as f:
-                f.write("#!/bin/bash\n")
-                f.write("# Auto-generated security profile creation script\n\n")
-                for command in commands:
-                    f.write(f"{command}\n")
+                f.write("#!/bin/bash\n# Auto-generated security profile creation script\n\n")
+                f.write("\n".join(commands))
+                f.write("\n")
+            os.chmod(script_file, 0o755)
             
             print(f"Security profile creation script saved: {script_file}")
             print("Run this script to create missing security profiles before importing users")
         
-        # Step 4: Import users to target region (dry run first)
-        logger.info("Step 4: Running import dry run...")
-        importer = ConnectUserImporter(
-            instance_id=target_instance_id,
-            region=target_region,
-            profile=aws_profile
-        )
-        
-        dry_run_results = importer.import_users(
-            export_file=export_file,
-            batch_size=25,
-            dry_run=True
-        )
-        
         print(f"Cross-region migration dry run results:")
         print(f"- Would succeed: {dry_run_results['success']}")
         print(f"- Would fail: {dry_run_results['failed']}")
         print(f"- Would skip: {dry_run_results['skipped']}")
         
-        if dry_run_results['success'] > 0 and not comparison['missing_profiles']:
-            logger.info("Step 5: Proceeding with actual import...")
+        if dry_run_results['success'] > 0 and not missing_profiles:
+            logger.info("Step 4: Proceeding with actual import...")
+            # Reuses the dry run's scan of the export; the target is listed again
             import_results = importer.import_users(
                 export_file=export_file,
-                batch_size=25,
-                dry_run=False
+                dry_run=False,
+                reuse_dry_run=True
             )
             
             print(f"Cross-region migration completed:")
@@ -333,13 +418,15 @@ def security_profile_analysis_example():
     """
     Example of using the security profile helper for analysis and creation
     """
+    from security_profile_helper import SecurityProfileHelper
+    
     export_file = "users_export.json"
     target_instance_id = "your-target-instance-id"
     region = "us-east-1"
     
     try:
-        # Initialize security profile helper
-        security_helper = SecurityProfileHelper(region=region)
+        # Initialize one security profile helper and reuse it for every step
+        security_helper = SecurityProfileHelper(region=region, client_config=create_client_config())
         
         # Step 1: Analyze export file
         print("Step 1: Analyzing export file for security profile requirements...")
@@ -354,21 +441,24 @@ def security_profile_analysis_example():
         
         # Step 2: Compare with target instance
         print("\nStep 2: Comparing with target instance...")
-        comparison = security_helper.compare_security_profiles(export_file, target_instance_id)
+        comparison = security_helper.compare_profiles(export_file, target_instance_id)
         
         print(f"Comparison Results:")
         print(f"- Existing profiles: {len(comparison['existing_profiles'])}")
-        print(f"- Missing profiles: {len(comparison['missing_profiles'])}")
+        missing_profiles = comparison['missing_profiles']  # set of profile names
+        print(f"- Missing profiles: {len(missing_profiles)}")
         
-        if comparison['missing_profiles']:
+        if missing_profiles:
             print(f"Missing profiles:")
-            for profile in comparison['missing_profiles']:
+            for profile in sorted(missing_profiles):
                 print(f"  - {profile}")
         
         # Step 3: Generate creation commands if needed
-        if comparison['missing_profiles']:
+        if missing_profiles:
             print("\nStep 3: Generating creation commands...")
-            commands = security_helper.generate_security_profile_commands(export_file, target_instance_id)
+            commands = security_helper.generate_security_profile_commands(
+                export_file, target_instance_id, comparison=comparison
+            )
             
             print(f"Generated {len(commands)} AWS CLI commands:")
             for i, command in enumerate(commands[:3], 1):  # Show first 3 as examples
@@ -384,32 +474,50 @@ def queue_migration_with_prefix_example():
     """
     Example of exporting queues with BU tag and queue name prefix filtering
     """
+    from connect_queue_export import ConnectQueueExporter
+    
     instance_id = "your-instance-id"
     bu_tag_value = "YourBU"
     queue_prefix = "Q_QC_"  # Only export queues starting with Q_QC_
     region = "us-east-1"
     
     try:
-        # Export queues with both BU tag and prefix filtering
-        print(f"Exporting queues with BU tag '{bu_tag_value}' and prefix '{queue_prefix}'...")
+        # Export every queue for the BU once. The prefix-filtered export is a subset of
+        # it, so it is filtered locally rather than scanning and describing the queues again.
+        print(f"Exporting all queues with BU tag '{bu_tag_value}'...")
         
         queue_exporter = ConnectQueueExporter(
             instance_id=instance_id,
             bu_tag_value=bu_tag_value,
-            queue_prefix=queue_prefix,
-            region=region
+            region=region,
+            session=create_session(),
+            client_config=create_client_config()
         )
         
-        export_file = queue_exporter.export_queues()
+        queue_exporter.export_queues_by_bu_tag("all_queues_export.json")
+        export_data_all = queue_exporter.last_export_data
+        
+        # Apply the prefix filter to the in-memory export and save it in the same format
+        print(f"Filtering queues by prefix '{queue_prefix}'...")
+        filtered_queues = [q for q in export_data_all['Queues'] if q['Queue']['Name'].startswith(queue_prefix)]
+        filtered_failures = [q for q in export_data_all['FailedQueues'] if q['Name'].startswith(queue_prefix)]
+        export_data = {
+            **export_data_all,
+            'QueuePrefix': queue_prefix,
+            'MatchingQueues': len(filtered_queues),
+            'SuccessfulExports': len(filtered_queues),
+            'FailedExports': len(filtered_failures),
+            'Queues': filtered_queues,
+            'FailedQueues': filtered_failures
+        }
+        
+        export_file = f"queues_export_{bu_tag_value}_{queue_prefix}.json"
+        save_json(export_data, export_file)
         print(f"Queue export completed: {export_file}")
         
-        # Load and analyze the export
-        with open(export_file, 'r') as f:
-            export_data = json.load(f)
-        
         print(f"Export Summary:")
         print(f"- Total queues scanned: {export_data['TotalQueuesScanned']}")
-        print(f"- Matching queues exported: {export_data['TotalQueues']}")
+        print(f"- Matching queues exported: {export_data['MatchingQueues']}")
         print(f"- BU tag filter: {export_data['BUTagValue']}")
         print(f"- Queue prefix filter: {export_data['QueuePrefix']}")
         
@@ -419,23 +527,9 @@ def queue_migration_with_prefix_example():
             for queue in export_data['Queues'][:5]:
                 print(f"  - {queue['Queue']['Name']}")
         
-        # Example without prefix filtering (all queues for BU)
-        print(f"\nComparing with export of all queues for BU '{bu_tag_value}'...")
-        
-        queue_exporter_all = ConnectQueueExporter(
-            instance_id=instance_id,
-            bu_tag_value=bu_tag_value,
-            region=region
-        )
-        
-        export_file_all = queue_exporter_all.export_queues("all_queues_export.json")
-        
-        with open(export_file_all, 'r') as f:
-            export_data_all = json.load(f)
-        
-        print(f"All queues export: {export_data_all['TotalQueues']} queues")
-        print(f"Prefix filtered export: {export_data['TotalQueues']} queues")
-        print(f"Filtering saved: {export_data_all['TotalQueues'] - export_data['TotalQueues']} queues")
+        print(f"\nAll queues export: {export_data_all['MatchingQueues']} queues")
+        print(f"Prefix filtered export: {export_data['MatchingQueues']} queues")
+        print(f"Filtering saved: {export_data_all['MatchingQueues'] - export_data['MatchingQueues']} queues")
         
     except Exception as e:
         print(f"Queue migration with prefix example failed: {e}")
@@ -444,6 +538,8 @@ def phone_number_mapping_example():
     """
     Example of creating phone number mappings for cross-region migration
     """
+    from connect_phone_number_mapper import ConnectPhoneNumberMapper
+    
     source_instance_id = "your-source-instance-id"
     target_instance_id = "your-target-instance-id"
     source_region = "us-east-1"
@@ -453,7 +549,7 @@ def phone_number_mapping_example():
         # Step 1: Create mapping template
         print("Step 1: Creating phone number mapping template...")
         
-        phone_mapper = ConnectPhoneNumberMapper(region=source_region)
+        phone_mapper = ConnectPhoneNumberMapper(region=source_region, client_config=create_client_config())
         template_file = phone_mapper.create_mapping_template(
             source_instance_id, 
             target_instance_id,
@@ -463,8 +559,7 @@ def phone_number_mapping_example():
         print(f"Mapping template created: {template_file}")
         
         # Step 2: Load and show template structure
-        with open(template_file, 'r') as f:
-            template_data = json.load(f)
+        template_data = load_json(template_file)
         
         print(f"Template contains:")
         print(f"- Source instance: {template_data['source_instance']}")
@@ -476,22 +571,21 @@ def phone_number_mapping_example():
         # Show sample mappings
         if template_data['phone_mappings']:
             print(f"Sample phone number mappings needed:")
-            for phone_number, mapping in list(template_data['phone_mappings'].items())[:3]:
+            for phone_number, mapping in islice(template_data['phone_mappings'].items(), 3):
                 print(f"  {phone_number}: {mapping['source_id']} -> [TARGET_ID_NEEDED]")
         
         # Step 3: Validate mapping (assuming user filled it out)
         print(f"\nStep 3: Validating mapping file...")
         
-        # For demo, create a sample filled mapping
+        # For demo, create a sample filled mapping. The template isn't used again, so
+        # it is filled in place rather than copied
         sample_mapping = template_file.replace('.json', '_filled.json')
-        filled_data = template_data.copy()
         
         # Simulate filling out target IDs (in real usage, user would do this)
-        for phone_number, mapping in filled_data['phone_mappings'].items():
+        for mapping in template_data['phone_mappings'].values():
             mapping['target_id'] = f"target-{mapping['source_id'][-8:]}"  # Demo target ID
         
-        with open(sample_mapping, 'w') as f:
-            json.dump(filled_data, f, indent=2)
+        save_json(template_data, sample_mapping)
         
         # Validate the filled mapping
         validation_result = phone_mapper.validate_mapping_file(sample_mapping)
@@ -508,49 +602,31 @@ def phone_number_mapping_example():
     except Exception as e:
         print(f"Phone number mapping example failed: {e}")
 
+EXAMPLES = {
+    'migrate_users': (migrate_users_example, "Complete migration workflow"),
+    'export_only': (export_only_example, "Export users only"),
+    'import_only': (import_only_example, "Import users only"),
+    'validate_export_file': (validate_export_file_example, "Validate export file"),
+    'performance_optimization': (performance_optimization_example, "Optimize batch sizes"),
+    'tag_preservation': (tag_preservation_example, "Demonstrate tag handling"),
+    'cross_region_migration': (cross_region_migration_example, "Cross-region migration with security profiles"),
+    'security_profile_analysis': (security_profile_analysis_example, "Analyze and create security profiles"),
+    'queue_migration_with_prefix': (queue_migration_with_prefix_example, "Export queues with prefix filtering"),
+    'phone_number_mapping': (phone_number_mapping_example, "Create phone number mappings for cross-region"),
+}
+
 if __name__ == "__main__":
-    # Uncomment the example you want to run
-    
-    # Full migration example
-    # migrate_users_example()
-    
-    # Export only
-    # export_only_example()
-    
-    # Import only
-    # import_only_example()
-    
-    # Validate export file
-    # validate_export_file_example()
-    
-    # Performance optimization
-    # performance_optimization_example()
-    
-    # Tag preservation demonstration
-    # tag_preservation_example()
-    
-    # Cross-region migration with security profiles
-    # cross_region_migration_example()
-    
-    # Security profile analysis and creation
-    # security_profile_analysis_example()
-    
-    # Queue export with prefix filtering
-    # queue_migration_with_prefix_example()
+    import argparse
     
-    # Phone number mapping for cross-region
-    # phone_number_mapping_example()
+    parser = argparse.ArgumentParser(description='Run an Amazon Connect migration example')
+    parser.add_argument('--example', choices=EXAMPLES, help='Example to run (lists the examples when omitted)')
+    args = parser.parse_args()
     
-    print("Amazon Connect Migration Examples")
-    print("=================================")
-    print("Update the configuration variables and uncomment the desired example function to run:")
-    print("1. migrate_users_example() - Complete migration workflow")
-    print("2. export_only_example() - Export users only")
-    print("3. import_only_example() - Import users only")
-    print("4. validate_export_file_example() - Validate export file")
-    print("5. performance_optimization_example() - Optimize batch sizes")
-    print("6. tag_preservation_example() - Demonstrate tag handling")
-    print("7. cross_region_migration_example() - Cross-region migration with security profiles")
-    print("8. security_profile_analysis_example() - Analyze and create security profiles")
-    print("9. queue_migration_with_prefix_example() - Export queues with prefix filtering")
-    print("10. phone_number_mapping_example() - Create phone number mappings for cross-region")
\ No newline at end of file
+    if args.example:
+        EXAMPLES[args.example][0]()
+    else:
+        print("Amazon Connect Migration Examples")
+        print("=================================")
+        print("Update the configuration variables in the example, then run it with --example NAME:")
+        for i, (name, (_, description)) in enumerate(EXAMPLES.items(), 1):
+            print(f"{i}. {name} - {description}")
@@ -1,69 +1,68 @@
 #!/usr/bin/env python3
 """
-Performance tuning examples and batch size optimization for Connect user migration
+Performance tuning examples and concurrency/pacing recommendations for Connect user migration
 """
 
+import bisect
+import json
+import math
+import os
+import tempfile
 import time
 import logging
+from itertools import islice
 from connect_user_export import ConnectUserExporter
-from connect_user_import import ConnectUserImporter
+from connect_user_import import ConnectUserImporter, DEFAULT_CREATE_USER_TPS, MAX_CONCURRENT_CREATES
 
 logger = logging.getLogger(__name__)
 
 class PerformanceTuner:
-    """Helper class for optimizing batch sizes and performance"""
+    """Helper class for optimizing batch sizes, import concurrency and pacing"""
     
     def __init__(self, instance_id: str, region: str = 'us-east-1', profile: str = None):
         self.instance_id = instance_id
         self.region = region
         self.profile = profile
     
-    def benchmark_batch_sizes(self, export_file: str, test_sizes: list = None):
+    def benchmark_batch_sizes(self, export_file: str, test_sizes: list = None, sample_size: int = 500):
         """
         Test different batch sizes to find optimal performance
         
+        Each size is dry-run against the same sample of users taken from the start of
+        the export, rather than the whole export, so the benchmark stays quick for
+        large exports.
+        
         Args:
             export_file: Path to export file
             test_sizes: List of batch sizes to test (default: [10, 25, 50, 100])
+            sample_size: Number of users to benchmark with (default: 500)
         """
         if not test_sizes:
             test_sizes = [10, 25, 50, 100]
         
         results = {}
         
-        for batch_size in test_sizes:
-            logger.info(f"Testing batch size: {batch_size}")
-            
-            try:
-                importer = ConnectUserImporter(
-                    instance_id=self.instance_id,
-                    region=self.region,
-                    profile=self.profile
-                )
-                
-                start_time = time.time()
-                
-                # Run dry run to measure performance without creating users
-                result = importer.import_users(
-                    export_file=export_file,
-                    batch_size=batch_size,
-                    dry_run=True
-                )
-                
-                end_time = time.time()
-                duration = end_time - start_time
-                
-                results[batch_size] = {
-                    'duration': duration,
-                    'users_per_second': result['success'] / duration if duration > 0 else 0,
-                    'success_count': result['success']
-                }
-                
-                logger.info(f"Batch size {batch_size}: {duration:.2f}s, {results[batch_size]['users_per_second']:.2f} users/sec")
-                
-            except Exception as e:
-                logger.error(f"Error testing batch size {batch_size}: {e}")
-                results[batch_size] = {'error': str(e)}
+        importer = ConnectUserImporter(
+            instance_id=self.instance_id,
+            region=self.region,
+            profile=self.profile
+        )
+        
+        # Stream just the sample out of the export and write it as a small export file
+        header = importer.read_export_header(export_file)
+        sample_users = list(islice(importer.iter_export_users(export_file), sample_size))
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+            json.dump({**header, 'TotalUsers': len(sample_users), 'Users': sample_users}, f)
+            sample_file = f.name
+        
+        logger.info(f"Benchmarking with a sample of {len(sample_users)} users")
+        del sample_users
+        
+        try:
+            for batch_size in test_sizes:
+                results[batch_size] = self._benchmark_dry_run(importer, sample_file, batch_size)
+        finally:
+            os.remove(sample_file)
         
         # Find optimal batch size
         best_batch_size = max(
@@ -74,6 +73,140 @@ class PerformanceTuner:
         
         logger.info(f"Recommended batch size: {best_batch_size}")
         return results, best_batch_size
+    
+    def _benchmark_dry_run(self, importer: ConnectUserImporter, export_file: str, batch_size: int) -> dict:
+        """Time one dry-run import at the given batch size"""
+        logger.info(f"Testing batch size: {batch_size}")
+        
+        try:
+            start_time = time.perf_counter()
+            
+            # Run dry run to measure performance without creating users
+            result = importer.import_users(
+                export_file=export_file,
+                batch_size=batch_size,
+                dry_run=True
+            )
+            
+            end_time = time.perf_counter()
+            duration = end_time - start_time
+            
+            users_per_second = result['success'] / duration if duration > 0 else 0
+            logger.info(f"Batch size {batch_size}: {duration:.2f}s, {users_per_second:.2f} users/sec")
+            
+            return {
+                'duration': duration,
+                'users_per_second': users_per_second,
+                'success_count': result['success']
+            }
+            
+        except Exception as e:
+            logger.error(f"Error testing batch size {batch_size}: {e}")
+            return {'error': str(e)}
+
+    def benchmark_workers(self, export_file: str, create_users: bool = False, test_workers: list = None,
+                          sample_size: int = 20, create_user_tps: float = DEFAULT_CREATE_USER_TPS):
+        """
+        Measure the create rate the target instance sustains at different worker counts
+        
+        Unlike benchmark_batch_sizes this imports real users, since a dry run makes no
+        create_user calls, so it only runs with create_users=True and should be pointed
+        at a test instance. Each worker count gets its own slice of the export; users
+        that already exist (e.g. from an earlier benchmark) are reported separately and
+        don't count towards the rate.
+        
+        Args:
+            export_file: Path to export file
+            create_users: Must be True to confirm that real users may be created
+            test_workers: Worker counts to test (default: [5, 10, 25, 50])
+            sample_size: Number of users imported per worker count (default: 20)
+            create_user_tps: create_user pacing for every run (default: Connect's default
+                quota); set it to the account's raised quota to see what that sustains
+            
+        Returns:
+            Tuple of (results by worker count, fastest worker count or None)
+        """
+        if not create_users:
+            raise ValueError("benchmark_workers creates real users; pass create_users=True to run it")
+        
+        if not test_workers:
+            test_workers = [5, 10, 25, 50]
+        
+        results = {}
+        
+        logger.warning(f"Benchmark creates up to {len(test_workers) * sample_size} real users "
+                       f"in instance {self.instance_id}")
+        
+        # One importer (and its client and connection pool, sized for the largest worker
+        # count) serves every run; only its create concurrency and pacing change
+        importer = ConnectUserImporter(
+            instance_id=self.instance_id,
+            region=self.region,
+            profile=self.profile,
+            max_workers=max(test_workers)
+        )
+        header = importer.read_export_header(export_file)
+        users_iter = importer.iter_export_users(export_file)
+        
+        try:
+            for workers in test_workers:
+                # Write the next unused slice of the export as a small export file
+                sample_users = list(islice(users_iter, sample_size))
+                if not sample_users:
+                    logger.warning(f"Export has no users left to benchmark {workers} workers")
+                    break
+                
+                with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+                    json.dump({**header, 'TotalUsers': len(sample_users), 'Users': sample_users}, f)
+                    sample_file = f.name
+                del sample_users
+                
+                importer.configure_creates(workers, create_user_tps)
+                try:
+                    results[workers] = self._benchmark_import(importer, sample_file, workers)
+                finally:
+                    os.remove(sample_file)
+        finally:
+            users_iter.close()
+        
+        best_workers = max(
+            [workers for workers, result in results.items() if result.get('users_per_second')],
+            key=lambda x: results[x]['users_per_second'],
+            default=None
+        )
+        
+        if best_workers is not None:
+            rate = results[best_workers]['users_per_second']
+            logger.info(f"Fastest: {best_workers} workers at {rate:.2f} users/sec - "
+                        f"use --workers {best_workers} and a --create-user-tps no higher than {rate:.1f}")
+        return results, best_workers
+    
+    def _benchmark_import(self, importer: ConnectUserImporter, export_file: str, workers: int) -> dict:
+        """Time one real import of the sample file"""
+        logger.info(f"Testing {workers} workers")
+        
+        try:
+            start_time = time.perf_counter()
+            result = importer.import_users(export_file=export_file)
+            duration = time.perf_counter() - start_time
+            
+            # Users that already existed only hit DuplicateResourceException, which is much
+            # faster than a real create, so only new users count towards the rate
+            users_per_second = result['success'] / duration if duration > 0 else 0
+            logger.info(f"{workers} workers: {duration:.2f}s, {users_per_second:.2f} users/sec "
+                        f"({result['failed']} failed, {result['existing']} already existed)")
+            
+            return {
+                'duration': duration,
+                'users_per_second': users_per_second,
+                'success_count': result['success'],
+                'existing_count': result['existing'],
+                'failed_count': result['failed']
+            }
+            
+        except Exception as e:
+            logger.error(f"Error testing {workers} workers: {e}")
+            return {'error': str(e)}
 
 def optimized_export_example():
     """Example of optimized export for large datasets"""
@@ -85,49 +218,50 @@ def optimized_export_example():
     
     logger.info("Starting optimized export for large dataset...")
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     export_file = exporter.export_users()
-    end_time = time.time()
+    end_time = time.perf_counter()
     
     logger.info(f"Export completed in {end_time - start_time:.2f} seconds")
     logger.info(f"Export file: {export_file}")
 
 def optimized_import_example():
-    """Example of optimized import with different batch sizes"""
+    """Example of an import configured for the account's CreateUser quota"""
     
     instance_id = "your-target-instance-id"
     export_file = "users_export.json"
     
-    # Test different configurations
-    configurations = [
-        {'batch_size': 25, 'description': 'Conservative (safest)'},
-        {'batch_size': 50, 'description': 'Balanced (recommended)'},
-        {'batch_size': 100, 'description': 'Aggressive (fastest)'},
-    ]
+    # The target account's CreateUser quota (see Service Quotas); 2 TPS unless raised
+    create_user_quota = DEFAULT_CREATE_USER_TPS
+    settings = get_recommended_import_settings(create_user_quota)
+    logger.info(f"Recommended settings: {settings['description']}")
     
-    for config in configurations:
-        logger.info(f"Testing {config['description']} - Batch size: {config['batch_size']}")
+    importer = ConnectUserImporter(
+        instance_id=instance_id,
+        max_workers=settings['workers'],
+        create_user_tps=settings['create_user_tps']
+    )
+    
+    user_count = importer.read_export_header(export_file).get('TotalUsers', 0)
+    estimate = estimate_import_seconds(user_count, settings['create_user_tps'])
+    logger.info(f"Estimated import time for {user_count:,} users: {estimate / 60:.0f} minutes")
+    
+    try:
+        # Dry run first
+        results = importer.import_users(export_file=export_file, dry_run=True)
+        logger.info(f"Dry run results: {results}")
         
-        try:
-            importer = ConnectUserImporter(instance_id=instance_id)
+        if results['success'] > 0:
+            start_time = time.perf_counter()
+            results = importer.import_users(export_file=export_file, reuse_dry_run=True)
+            duration = time.perf_counter() - start_time
             
-            # Dry run first
-            start_time = time.time()
-            results = importer.import_users(
-                export_file=export_file,
-                batch_size=config['batch_size'],
-                dry_run=True
-            )
-            end_time = time.time()
-            
-            duration = end_time - start_time
             users_per_second = results['success'] / duration if duration > 0 else 0
-            
             logger.info(f"Performance: {users_per_second:.2f} users/second")
             logger.info(f"Results: {results}")
-            
-        except Exception as e:
-            logger.error(f"Error with batch size {config['batch_size']}: {e}")
+        
+    except Exception as e:
+        logger.error(f"Optimized import failed: {e}")
 
 def memory_efficient_processing():
     """Example of memory-efficient processing for very large datasets"""
@@ -174,17 +308,48 @@ BATCH_SIZE_RECOMMENDATIONS = {
     }
 }
 
+# User count thresholds between the tiers above, with the recommendation for each tier in order
+BATCH_SIZE_THRESHOLDS = (1000, 5000, 20000)
+BATCH_SIZE_TIERS = tuple(BATCH_SIZE_RECOMMENDATIONS[tier] for tier in ('small', 'medium', 'large', 'very_large'))
+
 def get_recommended_batch_size(user_count: int) -> dict:
     """Get recommended batch size based on user count"""
     
-    if user_count < 1000:
-        return BATCH_SIZE_RECOMMENDATIONS['small']
-    elif user_count < 5000:
-        return BATCH_SIZE_RECOMMENDATIONS['medium']
-    elif user_count < 20000:
-        return BATCH_SIZE_RECOMMENDATIONS['large']
-    else:
-        return BATCH_SIZE_RECOMMENDATIONS['very_large']
+    return BATCH_SIZE_TIERS[bisect.bisect_right(BATCH_SIZE_THRESHOLDS, user_count)]
+
+# Rough round trip of one create_user call, used to size workers for a given pacing
+CREATE_USER_LATENCY_SECONDS = 0.5
+
+# Fewest workers recommended, so a few slow calls don't hold the rate below the pacing
+MIN_RECOMMENDED_WORKERS = 4
+
+def get_recommended_import_settings(create_user_quota: float = DEFAULT_CREATE_USER_TPS) -> dict:
+    """
+    Get recommended importer settings for the target account's CreateUser quota
+    
+    Import speed is set by create_user_tps, which should match the quota; workers only
+    has to keep that many calls in flight (quota x call latency, doubled for slow calls
+    and retries). Dataset size doesn't change either setting.
+    
+    Args:
+        create_user_quota: The account's CreateUser quota in requests per second
+        
+    Returns:
+        Dict with workers, create_user_tps and a description
+    """
+    workers = math.ceil(2 * create_user_quota * CREATE_USER_LATENCY_SECONDS)
+    workers = min(MAX_CONCURRENT_CREATES, max(MIN_RECOMMENDED_WORKERS, workers))
+    
+    return {
+        'workers': workers,
+        'create_user_tps': create_user_quota,
+        'description': f"--workers {workers} --create-user-tps {create_user_quota:g}"
+    }
+
+def estimate_import_seconds(user_count: int, create_user_tps: float = DEFAULT_CREATE_USER_TPS) -> float:
+    """Estimate how long creating user_count users takes at the given pacing"""
+    
+    return user_count / create_user_tps
 
 if __name__ == "__main__":
     # Configure logging
@@ -205,4 +370,11 @@ if __name__ == "__main__":
     print("\nBatch size recommendations:")
     for count in test_counts:
         rec = get_recommended_batch_size(count)
-        print(f"{count:,} users: {rec['batch_size']} batch size - {rec['description']}")
\ No newline at end of file
+        print(f"{count:,} users: {rec['batch_size']} batch size - {rec['description']}")
+    
+    quotas = [2, 5, 10, 50]
+    print("\nImport settings by CreateUser quota (10,000 users):")
+    for quota in quotas:
+        rec = get_recommended_import_settings(quota)
+        minutes = estimate_import_seconds(10000, quota) / 60
+        print(f"{quota:g} TPS: {rec['description']} - about {minutes:.0f} minutes")
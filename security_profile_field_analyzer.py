@@ -7,9 +7,20 @@ Analyzes the field names used in security profile API responses across different
 import boto3
 import json
 import logging
-from typing import Dict, List
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+try:
+    import orjson
+except ImportError:  # Optional - faster JSON encoding, falls back to json
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,17 +28,60 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# On-disk cache of list_security_profiles results, used when a cache TTL is set
+PROFILE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'connect_migration')
+
+# Field pattern bucket for each combination of name fields a profile can carry
+NAME_FIELDS = frozenset(('SecurityProfileName', 'Name'))
+FIELD_PATTERN_BUCKETS = {
+    frozenset(('SecurityProfileName',)): 'has_SecurityProfileName',
+    frozenset(('Name',)): 'has_Name',
+    NAME_FIELDS: 'has_both',
+    frozenset(): 'has_neither'
+}
+
+# Sample profiles kept per region; only their ID and name fields keep (truncated) values
+SAMPLE_PROFILE_COUNT = 3
+SAMPLE_VALUE_FIELDS = ('Id',) + tuple(sorted(NAME_FIELDS))
+SAMPLE_VALUE_MAX_LENGTH = 50
+
+def profile_preview(profile: Dict) -> Dict:
+    """Summarize a profile for the samples: ID and name values, plus the other field names"""
+    preview = {}
+    for field_name in SAMPLE_VALUE_FIELDS:
+        if field_name in profile:
+            field_value = profile[field_name]
+            if isinstance(field_value, str) and len(field_value) > SAMPLE_VALUE_MAX_LENGTH:
+                field_value = field_value[:SAMPLE_VALUE_MAX_LENGTH - 3] + "..."
+            preview[field_name] = field_value
+    preview['OtherFields'] = sorted(profile.keys() - set(SAMPLE_VALUE_FIELDS))
+    return preview
+
 class SecurityProfileFieldAnalyzer:
-    def __init__(self, instance_id: str, profile: str = None):
+    def __init__(self, instance_id: str, profile: str = None, session: Optional[boto3.Session] = None,
+                 cache_ttl: int = 0):
         """
         Initialize the analyzer
         
         Args:
             instance_id: Amazon Connect instance ID
             profile: AWS profile name (optional)
+            session: Existing boto3 session to reuse (optional, overrides profile)
+            cache_ttl: Seconds to reuse security profile listings cached on disk (default: 0, disabled)
         """
         self.instance_id = instance_id
         self.profile = profile
+        self.cache_ttl = cache_ttl
+        
+        # Security profile listings already fetched by this analyzer, keyed by region
+        self._profiles_cache = {}
+        
+        # One session for every region; only the per-region clients differ
+        if session is None:
+            session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        self._session = session
+        # Creating clients from a shared session is not thread-safe, and regions are analyzed concurrently
+        self._client_lock = threading.Lock()
     
     def analyze_region(self, region: str) -> Dict:
         """
@@ -42,20 +96,7 @@ class SecurityProfileFieldAnalyzer:
         logger.info(f"Analyzing security profile fields in region: {region}")
         
         try:
-            # Initialize AWS session and client for this region
-            session = boto3.Session(profile_name=self.profile) if self.profile else boto3.Session()
-            connect_client = session.client('connect', region_name=region)
-            
-            # Get security profiles using list_security_profiles
-            logger.info(f"Fetching security profiles via list_security_profiles in {region}...")
-            
-            security_profiles = []
-            paginator = connect_client.get_paginator('list_security_profiles')
-            
-            for page in paginator.paginate(InstanceId=self.instance_id):
-                profiles_page = page.get('SecurityProfileSummaryList', [])
-                security_profiles.extend(profiles_page)
-                logger.info(f"Retrieved {len(profiles_page)} security profiles from page")
+            security_profiles = self.fetch_security_profiles(region)
             
             logger.info(f"Total security profiles found in {region}: {len(security_profiles)}")
             
@@ -73,30 +114,18 @@ class SecurityProfileFieldAnalyzer:
                 }
             }
             
-            # Analyze each profile
-            for i, profile in enumerate(security_profiles):
-                # Store first 3 profiles as samples
-                if i < 3:
-                    analysis['sample_profiles'].append(profile)
-                
-                # Check field patterns
-                has_security_profile_name = 'SecurityProfileName' in profile
-                has_name = 'Name' in profile
-                
-                if has_security_profile_name and has_name:
-                    analysis['field_patterns']['has_both'] += 1
-                elif has_security_profile_name:
-                    analysis['field_patterns']['has_SecurityProfileName'] += 1
-                elif has_name:
-                    analysis['field_patterns']['has_Name'] += 1
-                else:
-                    analysis['field_patterns']['has_neither'] += 1
-                
-                # Collect all field names
-                for field_name in profile.keys():
-                    if field_name not in analysis['field_analysis']:
-                        analysis['field_analysis'][field_name] = 0
-                    analysis['field_analysis'][field_name] += 1
+            # Store previews of the first few profiles as samples, rather than whole profiles
+            analysis['sample_profiles'] = [profile_preview(profile) for profile in security_profiles[:SAMPLE_PROFILE_COUNT]]
+            
+            # Tally field names and name-field patterns across all profiles
+            field_counter = Counter()
+            pattern_counter = Counter()
+            for profile in security_profiles:
+                field_counter.update(profile.keys())
+                pattern_counter[FIELD_PATTERN_BUCKETS[frozenset(profile.keys() & NAME_FIELDS)]] += 1
+            
+            analysis['field_analysis'] = dict(field_counter)
+            analysis['field_patterns'].update(pattern_counter)
             
             return analysis
             
@@ -114,6 +143,59 @@ class SecurityProfileFieldAnalyzer:
                 'error': str(e)
             }
     
+    def fetch_security_profiles(self, region: str) -> List[Dict]:
+        """
+        List the instance's security profiles in a region, reusing cached listings
+        
+        Listings are kept in memory for the life of the analyzer. With a cache TTL set
+        they are also written under PROFILE_CACHE_DIR and reused by later runs until
+        the file is older than the TTL.
+        
+        Args:
+            region: AWS region to list security profiles in
+            
+        Returns:
+            Security profile summaries from list_security_profiles
+        """
+        if region in self._profiles_cache:
+            return self._profiles_cache[region]
+        
+        cache_file = os.path.join(PROFILE_CACHE_DIR, self.instance_id, f"{region}.json")
+        if self.cache_ttl > 0 and os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < self.cache_ttl:
+            logger.info(f"Using cached security profiles for {region} from {cache_file}")
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                security_profiles = json.load(f)
+            self._profiles_cache[region] = security_profiles
+            return security_profiles
+        
+        # Initialize a client for this region. Pages are fetched one at a time, so the
+        # default pool is enough; retries back off adaptively when throttled.
+        client_config = Config(
+            retries={'mode': 'adaptive', 'max_attempts': 10},
+            tcp_keepalive=True
+        )
+        with self._client_lock:
+            connect_client = self._session.client('connect', region_name=region, config=client_config)
+        
+        # Get security profiles using list_security_profiles
+        logger.info(f"Fetching security profiles via list_security_profiles in {region}...")
+        
+        security_profiles = []
+        paginator = connect_client.get_paginator('list_security_profiles')
+        
+        for page in paginator.paginate(InstanceId=self.instance_id):
+            profiles_page = page.get('SecurityProfileSummaryList', [])
+            security_profiles.extend(profiles_page)
+            logger.debug("Retrieved %d security profiles from page", len(profiles_page))
+        
+        if self.cache_ttl > 0:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump(security_profiles, f, default=str)
+        
+        self._profiles_cache[region] = security_profiles
+        return security_profiles
+    
     def compare_regions(self, regions: List[str]) -> Dict:
         """
         Compare security profile field formats across multiple regions
@@ -136,9 +218,17 @@ class SecurityProfileFieldAnalyzer:
             }
         }
         
-        # Analyze each region
+        # Each region is independent and network-bound, so analyze them concurrently.
+        # analyze_region builds its own client and returns errors as results.
+        region_analyses = {}
+        with ThreadPoolExecutor(max_workers=min(len(regions), 16) or 1) as executor:
+            futures = {executor.submit(self.analyze_region, region): region for region in regions}
+            for future in as_completed(futures):
+                region_analyses[futures[future]] = future.result()
+        
+        # Keep the requested region order for reporting
         for region in regions:
-            results['region_results'][region] = self.analyze_region(region)
+            results['region_results'][region] = region_analyses[region]
         
         # Compare results
         self.generate_comparison_analysis(results)
@@ -267,10 +357,7 @@ def print_analysis_results(results: Dict):
             if data['sample_profiles']:
                 print("Sample Profile Structure:")
                 sample = data['sample_profiles'][0]
-                for field_name in sorted(sample.keys()):
-                    field_value = sample[field_name]
-                    if isinstance(field_value, str) and len(field_value) > 50:
-                        field_value = field_value[:47] + "..."
+                for field_name, field_value in sorted(sample.items()):
                     print(f"  • {field_name}: {field_value}")
             print()
         
@@ -308,11 +395,13 @@ def main():
                        help='AWS regions to analyze (default: us-east-1 us-west-2)')
     parser.add_argument('--profile', help='AWS profile name')
     parser.add_argument('--output', help='Output file path for JSON results')
+    parser.add_argument('--cache-ttl', type=int, default=0,
+                       help='Reuse security profile listings cached on disk for this many seconds (default: 0, disabled)')
     
     args = parser.parse_args()
     
     try:
-        analyzer = SecurityProfileFieldAnalyzer(args.instance_id, args.profile)
+        analyzer = SecurityProfileFieldAnalyzer(args.instance_id, args.profile, cache_ttl=args.cache_ttl)
         results = analyzer.compare_regions(args.regions)
         
         # Print results to console
@@ -320,8 +409,13 @@ def main():
         
         # Save to file if requested
         if args.output:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, default=str)
+            # Serialize in one call and write the result in a single write
+            if orjson is not None:
+                output = orjson.dumps(results, option=orjson.OPT_INDENT_2, default=str)
+            else:
+                output = json.dumps(results, indent=2, default=str).encode('utf-8')
+            with open(args.output, 'wb') as f:
+                f.write(output)
             logger.info(f"Detailed results saved to: {args.output}")
         
     except Exception as e:
@@ -5,11 +5,33 @@ Analyzes export files and helps create missing security profiles in target insta
 """
 
 import boto3
+import gzip
 import json
 import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from connect_export_files import open_export_file
+
+try:
+    import orjson
+except ImportError:  # Optional - faster JSON decoding, falls back to json
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional - typed decoding of only the export fields the analysis needs
+    msgspec = None
+
+try:
+    import ijson
+except ImportError:  # Optional - falls back to loading the whole export file
+    ijson = None
 
 # Configure logging with UTF-8 encoding
 logging.basicConfig(
@@ -22,6 +44,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+if msgspec is not None:
+    # Only the fields analyze_export_file reads are declared; msgspec skips the rest of
+    # each user record while decoding instead of building dicts for it
+    class ExportUser(msgspec.Struct):
+        Username: str
+    
+    class ExportUserEntry(msgspec.Struct):
+        User: ExportUser
+        SecurityProfiles: List[Dict[str, Any]] = []
+    
+    class UserExport(msgspec.Struct):
+        Users: List[ExportUserEntry] = []
+
+# Largest MaxResults the Connect list_* APIs accept
+LIST_PAGE_SIZE = 1000
+
+# AWS CLI command for creating a security profile
+CREATE_PROFILE_COMMAND_TEMPLATE = """aws connect create-security-profile \\
+  --instance-id {instance_id} \\
+  --security-profile-name "{profile_name}" \\
+  --description "Migrated security profile: {profile_name}" \\
+  --permissions {permissions} \\
+  --region {region}"""
+
+# Minimal permissions given to created profiles when the source permissions aren't copied
+DEFAULT_PROFILE_PERMISSIONS = ['BasicAgentAccess']
+
+# Upper bound on concurrent permission lookups against the source instance
+MAX_PERMISSION_LOOKUP_WORKERS = 16
+
+# Auto-named profile scripts with more commands than this are written gzip-compressed
+SCRIPT_GZIP_THRESHOLD = 1000
+
+# Line drawn above and below the run start/end markers
+RUN_SEPARATOR = "=" * 80
+
 def log_run_separator(script_name: str, action: str = "START"):
     """
     Log a clear separator for run identification (Windows-compatible)
@@ -30,33 +88,44 @@ def log_run_separator(script_name: str, action: str = "START"):
         script_name: Name of the script
         action: START or END
     """
-    separator = "=" * 80
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     
+    # One record per separator, so the block stays together in the log
     if action == "START":
-        logger.info(separator)
-        logger.info(f">> {script_name} - RUN STARTED at {timestamp}")
-        logger.info(separator)
+        logger.info(f"{RUN_SEPARATOR}\n>> {script_name} - RUN STARTED at {timestamp}\n{RUN_SEPARATOR}")
     elif action == "END":
-        logger.info(separator)
-        logger.info(f"<< {script_name} - RUN COMPLETED at {timestamp}")
-        logger.info(separator)
-        logger.info("")  # Empty line for visual separation
+        logger.info(f"{RUN_SEPARATOR}\n<< {script_name} - RUN COMPLETED at {timestamp}\n{RUN_SEPARATOR}\n")  # Trailing blank line for visual separation
 
 class SecurityProfileHelper:
-    def __init__(self, region: str = 'us-east-1', profile: str = None):
+    def __init__(self, region: str = 'us-east-1', profile: str = None, session: Optional[boto3.Session] = None,
+                 client_config: Optional[Config] = None):
         """
         Initialize Security Profile Helper
         
         Args:
             region: AWS region
             profile: AWS profile name (optional)
+            session: Existing boto3 session to create the client from (profile is ignored when given)
+            client_config: botocore client configuration (optional; defaults to adaptive retries)
         """
         self.region = region
         
-        # Initialize AWS session and client
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        self.connect_client = session.client('connect', region_name=region)
+        # Initialize AWS session and client. Calls are sequential, so the default pool is
+        # enough; retries back off adaptively when throttled.
+        if session is None:
+            session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        if client_config is None:
+            client_config = Config(
+                retries={'mode': 'adaptive', 'max_attempts': 10},
+                tcp_keepalive=True
+            )
+        self.connect_client = session.client('connect', region_name=region, config=client_config)
+        # Kept for source-region clients when copying permissions from another region
+        self._session = session
+        
+        # Export analyses keyed by (path, mtime), so comparing and generating commands for
+        # the same unchanged export doesn't parse it again
+        self._analysis_cache = {}
         
         logger.info(f"Initialized security profile helper in region: {region}")
     
@@ -68,44 +137,76 @@ class SecurityProfileHelper:
             export_file: Path to user export file
             
         Returns:
-            Analysis results
+            Analysis results: required_profiles, profile_usage (name -> user count), total_users,
+            and profile_users (name -> usernames) when debug logging is enabled
         """
+        cache_key = (os.path.abspath(export_file), os.path.getmtime(export_file))
+        if cache_key in self._analysis_cache:
+            logger.info(f"Using cached analysis of {export_file}")
+            return self._analysis_cache[cache_key]
+        
         log_run_separator("SECURITY PROFILE ANALYSIS", "START")
         
         try:
-            with open(export_file, 'r', encoding='utf-8') as f:
-                export_data = json.load(f)
-            
-            users = export_data.get('Users', [])
             required_profiles = {}
-            profile_usage = {}
+            # Only counts are needed in the common path; usernames are kept for debug output only
+            profile_usage = defaultdict(int)
+            profile_users = defaultdict(list) if logger.isEnabledFor(logging.DEBUG) else None
+            total_users = 0
             
-            for user_data in users:
-                username = user_data['User']['Username']
+            # User exports may be compressed (.json.gz or .json.zst). With ijson the users are
+            # streamed one at a time rather than loading the whole export; otherwise the file
+            # is read once and decoded with msgspec (only the needed fields) or orjson when
+            # either is installed.
+            # Bound once rather than looked up for every security profile of every user
+            get_field = dict.get
+            add_required_profile = required_profiles.setdefault
+            
+            with open_export_file(export_file) as f:
+                # Each user is reduced to (username, security profiles)
+                if ijson is None and msgspec is not None:
+                    export_data = msgspec.json.decode(f.read(), type=UserExport)
+                    user_profiles = ((entry.User.Username, entry.SecurityProfiles) for entry in export_data.Users)
+                else:
+                    if ijson is not None:
+                        users = ijson.items(f, 'Users.item', use_float=True)
+                    elif orjson is not None:
+                        users = orjson.loads(f.read()).get('Users', [])
+                    else:
+                        users = json.load(f).get('Users', [])
+                    user_profiles = (
+                        (user_data['User']['Username'], get_field(user_data, 'SecurityProfiles', []))
+                        for user_data in users
+                    )
                 
-                for security_profile in user_data.get('SecurityProfiles', []):
-                    # Handle different field names
-                    profile_name = security_profile.get('SecurityProfileName') or security_profile.get('Name')
+                for username, security_profiles in user_profiles:
+                    total_users += 1
                     
-                    if profile_name:
-                        if profile_name not in required_profiles:
-                            required_profiles[profile_name] = security_profile
-                            profile_usage[profile_name] = []
+                    for security_profile in security_profiles:
+                        # Handle different field names
+                        profile_name = get_field(security_profile, 'SecurityProfileName') or get_field(security_profile, 'Name')
                         
-                        profile_usage[profile_name].append(username)
+                        if profile_name:
+                            add_required_profile(profile_name, security_profile)
+                            profile_usage[profile_name] += 1
+                            if profile_users is not None:
+                                profile_users[profile_name].append(username)
             
             logger.info(f"Analysis of {export_file}:")
-            logger.info(f"  Total users: {len(users)}")
+            logger.info(f"  Total users: {total_users}")
             logger.info(f"  Unique security profiles required: {len(required_profiles)}")
             
-            for profile_name, users_list in profile_usage.items():
-                logger.info(f"  '{profile_name}': used by {len(users_list)} users")
+            for profile_name, users_count in profile_usage.items():
+                logger.info("  '%s': used by %d users", profile_name, users_count)
             
             result = {
                 'required_profiles': required_profiles,
-                'profile_usage': profile_usage,
-                'total_users': len(users)
+                'profile_usage': dict(profile_usage),
+                'total_users': total_users
             }
+            if profile_users is not None:
+                result['profile_users'] = dict(profile_users)
+            self._analysis_cache[cache_key] = result
             
             log_run_separator("SECURITY PROFILE ANALYSIS", "END")
             return result
@@ -128,7 +229,7 @@ class SecurityProfileHelper:
         
         try:
             paginator = self.connect_client.get_paginator('list_security_profiles')
-            for page in paginator.paginate(InstanceId=instance_id):
+            for page in paginator.paginate(InstanceId=instance_id, PaginationConfig={'PageSize': LIST_PAGE_SIZE}):
                 for profile in page.get('SecurityProfileSummaryList', []):
                     # Handle different possible field names for security profile name
                     profile_name = profile.get('SecurityProfileName') or profile.get('Name')
@@ -153,15 +254,23 @@ class SecurityProfileHelper:
             target_instance_id: Target instance ID
             
         Returns:
-            Comparison results
+            Comparison results. required_profiles and existing_profiles are live keys
+            views of the export analysis and the target listing (no sets are built for
+            them; use set() on them for a snapshot); missing_profiles and
+            available_profiles are sets.
         """
         log_run_separator("SECURITY PROFILE COMPARISON", "START")
         
-        analysis = self.analyze_export_file(export_file)
-        existing_profiles = self.get_existing_security_profiles(target_instance_id)
+        # List the target's profiles in the background while the export is parsed; the
+        # client is shared, which is safe for concurrent calls
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            existing_future = executor.submit(self.get_existing_security_profiles, target_instance_id)
+            analysis = self.analyze_export_file(export_file)
+            existing_profiles = existing_future.result()
         
-        required_names = set(analysis['required_profiles'].keys())
-        existing_names = set(existing_profiles.keys())
+        # Keys views support set operations directly, so no intermediate sets are built
+        required_names = analysis['required_profiles'].keys()
+        existing_names = existing_profiles.keys()
         
         missing_profiles = required_names - existing_names
         available_profiles = required_names & existing_names
@@ -182,70 +291,151 @@ class SecurityProfileHelper:
         if missing_profiles:
             logger.warning(f"Missing security profiles:")
             for profile_name in sorted(missing_profiles):
-                users_count = len(analysis['profile_usage'].get(profile_name, []))
-                logger.warning(f"  - '{profile_name}' (needed by {users_count} users)")
+                users_count = analysis['profile_usage'].get(profile_name, 0)
+                logger.warning("  - '%s' (needed by %d users)", profile_name, users_count)
+                if 'profile_users' in analysis:
+                    logger.debug("    Users: %s", ', '.join(analysis['profile_users'][profile_name]))
         
         log_run_separator("SECURITY PROFILE COMPARISON", "END")
         return comparison
     
-    def generate_security_profile_commands(self, export_file: str, target_instance_id: str) -> List[str]:
+    def get_source_profile_permissions(self, source_instance_id: str, profile_ids: Dict[str, str],
+                                       source_region: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Get the permissions of security profiles in the source instance
+        
+        Each profile's permissions are listed separately, so the lookups run concurrently.
+        
+        Args:
+            source_instance_id: Source instance ID
+            profile_ids: Dictionary mapping profile names to their IDs in the source instance
+            source_region: Region of the source instance (default: the helper's region)
+            
+        Returns:
+            Dictionary mapping profile names to permissions; profiles whose permissions
+            could not be read are left out
+        """
+        if not profile_ids:
+            return {}
+        
+        source_client = self.connect_client
+        if source_region and source_region != self.region:
+            source_client = self._session.client('connect', region_name=source_region,
+                                                 config=self.connect_client.meta.config)
+        
+        def list_permissions(profile_id: str) -> List[str]:
+            permissions = []
+            paginator = source_client.get_paginator('list_security_profile_permissions')
+            for page in paginator.paginate(SecurityProfileId=profile_id, InstanceId=source_instance_id,
+                                           PaginationConfig={'PageSize': LIST_PAGE_SIZE}):
+                permissions.extend(page.get('Permissions', []))
+            return permissions
+        
+        permissions_by_name = {}
+        with ThreadPoolExecutor(max_workers=min(len(profile_ids), MAX_PERMISSION_LOOKUP_WORKERS)) as executor:
+            futures = {executor.submit(list_permissions, profile_id): profile_name
+                       for profile_name, profile_id in profile_ids.items()}
+            for future in as_completed(futures):
+                profile_name = futures[future]
+                try:
+                    permissions_by_name[profile_name] = future.result()
+                except ClientError as e:
+                    logger.warning(f"Could not read permissions of source security profile '{profile_name}': {e}")
+        
+        logger.info(f"Read permissions of {len(permissions_by_name)}/{len(profile_ids)} source security profiles")
+        return permissions_by_name
+    
+    def generate_security_profile_commands(self, export_file: str, target_instance_id: str,
+                                           comparison: Optional[Dict] = None,
+                                           source_instance_id: Optional[str] = None,
+                                           source_region: Optional[str] = None) -> List[str]:
         """
         Generate AWS CLI commands to create missing security profiles
         
+        Profiles are created with BasicAgentAccess only, unless a source instance is given,
+        in which case each profile's permissions are copied from the source instance.
+        
         Args:
             export_file: Path to user export file
             target_instance_id: Target instance ID
+            comparison: Result of compare_profiles for the same export and instance
+                        (optional; computed when not given)
+            source_instance_id: Source instance to copy profile permissions from (optional)
+            source_region: Region of the source instance (default: the helper's region)
             
         Returns:
             List of AWS CLI commands
         """
-        comparison = self.compare_profiles(export_file, target_instance_id)
-        analysis = self.analyze_export_file(export_file)
-        
-        commands = []
+        if comparison is None:
+            comparison = self.compare_profiles(export_file, target_instance_id)
         
         if not comparison['missing_profiles']:
             logger.info("No missing security profiles - all required profiles exist in target!")
-            return commands
+            return []
         
         logger.info("Generating AWS CLI commands for missing security profiles...")
         
-        for profile_name in sorted(comparison['missing_profiles']):
-            # Create basic security profile with minimal permissions
-            command = f"""aws connect create-security-profile \\
-  --instance-id {target_instance_id} \\
-  --security-profile-name "{profile_name}" \\
-  --description "Migrated security profile: {profile_name}" \\
-  --permissions "BasicAgentAccess" \\
-  --region {self.region}"""
+        missing_profiles = sorted(comparison['missing_profiles'])
+        
+        source_permissions = {}
+        if source_instance_id:
+            # The export records each profile's ID in the source instance
+            required_profiles = self.analyze_export_file(export_file)['required_profiles']
+            profile_ids = {profile_name: required_profiles[profile_name]['Id']
+                           for profile_name in missing_profiles if required_profiles[profile_name].get('Id')}
+            source_permissions = self.get_source_profile_permissions(source_instance_id, profile_ids, source_region)
+        
+        commands = []
+        for profile_name in missing_profiles:
+            permissions = source_permissions.get(profile_name)
+            if not permissions:
+                if source_instance_id:
+                    logger.warning(f"No source permissions for '{profile_name}' - using {DEFAULT_PROFILE_PERMISSIONS}")
+                permissions = DEFAULT_PROFILE_PERMISSIONS
             
-            commands.append(command)
+            commands.append(CREATE_PROFILE_COMMAND_TEMPLATE.format(
+                instance_id=target_instance_id, profile_name=profile_name, region=self.region,
+                permissions=" ".join(f'"{permission}"' for permission in permissions)
+            ))
         
         return commands
     
-    def create_missing_profiles_script(self, export_file: str, target_instance_id: str, output_file: str = None):
+    def create_missing_profiles_script(self, export_file: str, target_instance_id: str, output_file: str = None,
+                                       comparison: Optional[Dict] = None, source_instance_id: Optional[str] = None,
+                                       source_region: Optional[str] = None):
         """
         Create a shell script to create missing security profiles
         
         Args:
             export_file: Path to user export file
             target_instance_id: Target instance ID
-            output_file: Output script file path
+            output_file: Output script file path (a .gz path writes the script gzip-compressed;
+                         auto-named scripts are compressed above SCRIPT_GZIP_THRESHOLD commands)
+            comparison: Result of compare_profiles for the same export and instance
+                        (optional; computed when not given)
+            source_instance_id: Source instance to copy profile permissions from (optional)
+            source_region: Region of the source instance (default: the helper's region)
         """
         log_run_separator("SECURITY PROFILE SCRIPT CREATION", "START")
         
-        if not output_file:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = f"create_security_profiles_{timestamp}.sh"
-        
-        commands = self.generate_security_profile_commands(export_file, target_instance_id)
+        commands = self.generate_security_profile_commands(
+            export_file, target_instance_id, comparison=comparison,
+            source_instance_id=source_instance_id, source_region=source_region
+        )
         
         if not commands:
             logger.info("No script needed - all security profiles exist!")
             log_run_separator("SECURITY PROFILE SCRIPT CREATION", "END")
             return
         
-        script_content = f"""#!/bin/bash
+        if not output_file:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_file = f"create_security_profiles_{timestamp}.sh"
+            # The repeated command text compresses very well
+            if len(commands) > SCRIPT_GZIP_THRESHOLD:
+                output_file += ".gz"
+        
+        script_parts = [f"""#!/bin/bash
 # Auto-generated script to create missing security profiles
 # Generated on: {datetime.now().isoformat()}
 # Source export: {export_file}
@@ -253,11 +443,11 @@ class SecurityProfileHelper:
 
 echo "Creating missing security profiles..."
 
-"""
+"""]
         
-        for i, command in enumerate(commands, 1):
-            script_content += f"""
-echo "Creating security profile {i}/{len(commands)}..."
+        total_commands = len(commands)
+        script_parts.extend(f"""
+echo "Creating security profile {i}/{total_commands}..."
 {command}
 
 if [ $? -eq 0 ]; then
@@ -266,18 +456,25 @@ else
     echo "❌ Failed to create security profile"
 fi
 
-"""
+""" for i, command in enumerate(commands, 1))
         
-        script_content += """
+        script_parts.append("""
 echo "Security profile creation completed!"
 echo "Note: You may need to configure specific permissions for each profile in the AWS Connect console."
-"""
+""")
         
-        with open(output_file, 'w') as f:
-            f.write(script_content)
-        
-        logger.info(f"Created script: {output_file}")
-        logger.info(f"Run: chmod +x {output_file} && ./{output_file}")
+        if output_file.endswith('.gz'):
+            with gzip.open(output_file, 'wt', compresslevel=6, encoding='utf-8') as f:
+                f.write("".join(script_parts))
+            
+            logger.info(f"Created compressed script: {output_file}")
+            logger.info(f"Run: zcat {output_file} | bash")
+        else:
+            with open(output_file, 'w') as f:
+                f.write("".join(script_parts))
+            
+            logger.info(f"Created script: {output_file}")
+            logger.info(f"Run: chmod +x {output_file} && ./{output_file}")
         
         log_run_separator("SECURITY PROFILE SCRIPT CREATION", "END")
 
@@ -292,7 +489,9 @@ def main():
     parser.add_argument('--target-instance', help='Target instance ID (required for compare/create-script)')
     parser.add_argument('--region', default='us-east-1', help='AWS region')
     parser.add_argument('--profile', help='AWS profile name')
-    parser.add_argument('--output', help='Output file path for create-script action')
+    parser.add_argument('--output', help='Output file path for create-script action (.sh, or .sh.gz for a compressed script)')
+    parser.add_argument('--source-instance', help='Source instance ID to copy profile permissions from (create-script)')
+    parser.add_argument('--source-region', help='Source instance region (default: --region)')
     
     args = parser.parse_args()
     
@@ -312,7 +511,9 @@ def main():
             if not args.target_instance:
                 logger.error("--target-instance required for create-script action")
                 exit(1)
-            helper.create_missing_profiles_script(args.export_file, args.target_instance, args.output)
+            helper.create_missing_profiles_script(args.export_file, args.target_instance, args.output,
+                                                  source_instance_id=args.source_instance,
+                                                  source_region=args.source_region)
         
     except Exception as e:
         logger.error(f"Operation failed: {e}")
@@ -4,22 +4,24 @@ Installation verification script for Amazon Connect Migration Scripts
 Run this script to verify that all dependencies are installed correctly.
 """
 
+import os
 import sys
 import importlib
 import subprocess
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-def check_python_version():
+def check_python_version(report=print):
     """Check if Python version is 3.7 or higher"""
     version = sys.version_info
     if version.major == 3 and version.minor >= 7:
-        print(f"✅ Python {version.major}.{version.minor}.{version.micro} - OK")
+        report(f"✅ Python {version.major}.{version.minor}.{version.micro} - OK")
         return True
     else:
-        print(f"❌ Python {version.major}.{version.minor}.{version.micro} - Requires Python 3.7+")
+        report(f"❌ Python {version.major}.{version.minor}.{version.micro} - Requires Python 3.7+")
         return False
 
-def check_dependencies():
+def check_dependencies(report=print):
     """Check if all required dependencies are installed"""
     dependencies = ['boto3', 'botocore', 'psutil']
     all_good = True
@@ -28,33 +30,38 @@ def check_dependencies():
         try:
             module = importlib.import_module(dep)
             version = getattr(module, '__version__', 'unknown')
-            print(f"✅ {dep} {version} - OK")
+            report(f"✅ {dep} {version} - OK")
         except ImportError:
-            print(f"❌ {dep} - NOT INSTALLED")
+            report(f"❌ {dep} - NOT INSTALLED")
             all_good = False
     
     return all_good
 
-def check_aws_cli():
+def check_aws_cli(report=print):
     """Check if AWS CLI is available (optional)"""
     try:
         result = subprocess.run(['aws', '--version'], 
                               capture_output=True, text=True, timeout=10)
         if result.returncode == 0:
             version = result.stdout.strip()
-            print(f"✅ AWS CLI - {version}")
+            report(f"✅ AWS CLI - {version}")
             return True
     except (subprocess.TimeoutExpired, FileNotFoundError):
         pass
     
-    print("⚠️  AWS CLI - NOT INSTALLED (optional but recommended)")
+    report("⚠️  AWS CLI - NOT INSTALLED (optional but recommended)")
     return False
 
-def check_scripts():
+def list_present_files() -> set:
+    """List the names in the current directory with a single directory scan"""
+    return {entry.name for entry in os.scandir('.')}
+
+def check_scripts(report=print, present: set = None):
     """Check if all migration scripts are present"""
     required_scripts = [
         'connect_user_export.py',
         'connect_user_import.py',
+        'connect_rate_limiter.py',
         'connect_queue_export.py', 
         'connect_queue_import.py',
         'connect_quick_connect_export.py',
@@ -63,17 +70,20 @@ def check_scripts():
         'security_profile_helper.py'
     ]
     
+    if present is None:
+        present = list_present_files()
+    
     all_present = True
     for script in required_scripts:
-        if Path(script).exists():
-            print(f"✅ {script} - Present")
+        if script in present:
+            report(f"✅ {script} - Present")
         else:
-            print(f"❌ {script} - MISSING")
+            report(f"❌ {script} - MISSING")
             all_present = False
     
     return all_present
 
-def check_documentation():
+def check_documentation(report=print, present: set = None):
     """Check if key documentation files are present"""
     docs = [
         'README.md',
@@ -83,12 +93,15 @@ def check_documentation():
         'CROSS_REGION_MIGRATION_GUIDE.md'
     ]
     
+    if present is None:
+        present = list_present_files()
+    
     all_present = True
     for doc in docs:
-        if Path(doc).exists():
-            print(f"✅ {doc} - Present")
+        if doc in present:
+            report(f"✅ {doc} - Present")
         else:
-            print(f"❌ {doc} - MISSING")
+            report(f"❌ {doc} - MISSING")
             all_present = False
     
     return all_present
@@ -98,20 +111,32 @@ def main():
     print("Amazon Connect Migration Scripts - Installation Verification")
     print("=" * 60)
     
-    print("\n🐍 Checking Python Version:")
-    python_ok = check_python_version()
+    # One directory scan serves both file presence checks
+    present = list_present_files()
     
-    print("\n📦 Checking Dependencies:")
-    deps_ok = check_dependencies()
+    checks = [
+        ("\n🐍 Checking Python Version:", check_python_version),
+        ("\n📦 Checking Dependencies:", check_dependencies),
+        ("\n☁️  Checking AWS CLI:", check_aws_cli),
+        ("\n📜 Checking Migration Scripts:", partial(check_scripts, present=present)),
+        ("\n📚 Checking Documentation:", partial(check_documentation, present=present))
+    ]
     
-    print("\n☁️  Checking AWS CLI:")
-    aws_ok = check_aws_cli()
+    # The checks are independent and mostly wait on imports, the aws subprocess and the
+    # filesystem, so run them concurrently. Each one reports into its own buffer, which is
+    # printed under its heading in the usual order.
+    outputs = [[] for _ in checks]
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = [executor.submit(check, output.append) for (_, check), output in zip(checks, outputs)]
     
-    print("\n📜 Checking Migration Scripts:")
-    scripts_ok = check_scripts()
+    results = []
+    for (heading, _), output, future in zip(checks, outputs, futures):
+        print(heading)
+        for line in output:
+            print(line)
+        results.append(future.result())
     
-    print("\n📚 Checking Documentation:")
-    docs_ok = check_documentation()
+    python_ok, deps_ok, aws_ok, scripts_ok, docs_ok = results
     
     print("\n" + "=" * 60)
     